@@ -1,7 +1,6 @@
 import asyncio
 import json
 import logging
-from io import BytesIO
 from typing import Literal
 
 import aiohttp
@@ -15,18 +14,22 @@ from fastapi import (
     HTTPException,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 
 from api import middleware
 from api.scheduler import setup_scheduler
-from db import database, crud, schemas
+from db import database, crud, schemas, redis_database
 from db.config import settings
 from scrapers.routes import router as scrapers_router
 from streaming_providers import mapper
+from streaming_providers.debrid_client import AsyncDebridClient
 from streaming_providers.routes import router as streaming_provider_router
-from utils import crypto, torrent, poster, const, wrappers, lock
+from utils import crypto, torrent, poster, const, wrappers, lock, local_cache
+from utils.http_client import http_clients
 from utils.parser import generate_manifest, get_json_data
+from utils.poster_store import poster_store
+from utils.title_index import title_search
 
 logging.basicConfig(
     format="%(levelname)s::%(asctime)s - %(message)s",
@@ -69,6 +72,13 @@ def get_user_data(request: Request) -> schemas.UserData:
 async def init_server():
     await database.init()
     await torrent.init_best_trackers()
+    app.state.meta_updates_listener = asyncio.create_task(
+        local_cache.listen_meta_updates(app.state.redis)
+    )
+    if settings.enable_title_search_index:
+        app.state.title_index_task = asyncio.create_task(
+            title_search.run(app.state.redis)
+        )
 
 
 @app.on_event("startup")
@@ -78,6 +88,9 @@ async def start_scheduler():
         setup_scheduler(scheduler)
         scheduler.start()
         app.state.scheduler = scheduler
+        app.state.backfill_task = asyncio.create_task(
+            crud.backfill_meta_stream_summary(app.state.redis)
+        )
 
 
 @app.on_event("shutdown")
@@ -89,7 +102,13 @@ async def stop_scheduler():
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    app.state.meta_updates_listener.cancel()
+    if hasattr(app.state, "title_index_task"):
+        app.state.title_index_task.cancel()
     await app.state.redis.aclose()
+    await AsyncDebridClient.close_http_clients()
+    await http_clients.close()
+    await redis_database.close()
 
 
 @app.get("/", tags=["home"])
@@ -109,7 +128,12 @@ async def get_home(request: Request):
 @app.get("/health", tags=["health"])
 @wrappers.exclude_rate_limit
 async def health(request: Request):
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "local_cache": local_cache.local_cache.stats(),
+        "user_data_cache": middleware.user_data_cache.stats(),
+        "http_clients": http_clients.stats(),
+    }
 
 
 @app.get("/favicon.ico")
@@ -134,6 +158,8 @@ async def configure(
     user_data: schemas.UserData = Depends(get_user_data),
 ):
     response.headers.update(const.NO_CACHE_HEADERS)
+    # The user data is shared with the other requests of the same secret_str.
+    user_data = user_data.model_copy(deep=True)
 
     # Remove the password from the streaming provider
     if user_data.streaming_provider:
@@ -249,8 +275,10 @@ async def get_catalog(
 
     # Try retrieving the cached data
     if cache_key:
-        if cached_data := await request.app.state.redis.get(cache_key):
-            return json.loads(cached_data)
+        if cached_data := await local_cache.get_cached_value(
+            request.app.state.redis, cache_key
+        ):
+            return cached_data
 
     metas = schemas.Metas()
     if catalog_type == "tv":
@@ -280,9 +308,11 @@ async def get_catalog(
             metas.metas.insert(0, delete_all_meta)
 
     if cache_key:
-        await request.app.state.redis.set(
+        await local_cache.set_cached_value(
+            request.app.state.redis,
             cache_key,
             metas.model_dump_json(exclude_none=True, by_alias=True),
+            metas,
             ex=settings.meta_cache_ttl,
         )
 
@@ -318,6 +348,9 @@ async def search_meta(
     response.headers.update(const.DEFAULT_HEADERS)
     logging.debug("search for catalog_id: %s", catalog_id)
 
+    if title_search.is_ready:
+        return title_search.search(search_query, catalog_type)
+
     return await crud.process_search_query(
         search_query, catalog_type, request.app.state.redis
     )
@@ -348,9 +381,10 @@ async def get_meta(
 
     cache_key = f"{catalog_type}_{meta_id}_meta"
     # Try retrieving the cached data
-    cached_data = await request.app.state.redis.get(cache_key)
-    if cached_data:
-        meta_data = json.loads(cached_data)
+    meta_data = await local_cache.get_cached_value(
+        request.app.state.redis, cache_key, tag=meta_id
+    )
+    if meta_data is not None:
         if not meta_data:
             raise HTTPException(status_code=404, detail="Meta ID not found.")
         return meta_data
@@ -371,7 +405,14 @@ async def get_meta(
 
     # Cache the data with a TTL of 30 minutes
     # If the data is not found, cached the empty data to avoid db query.
-    await request.app.state.redis.set(cache_key, json.dumps(data, default=str), ex=1800)
+    await local_cache.set_cached_value(
+        request.app.state.redis,
+        cache_key,
+        json.dumps(data, default=str),
+        data,
+        ex=1800,
+        tag=meta_id,
+    )
 
     if not data:
         raise HTTPException(status_code=404, detail="Meta ID not found.")
@@ -446,7 +487,18 @@ async def get_streams(
         response.headers.update(const.NO_CACHE_HEADERS)
         fetched_streams = await crud.get_tv_streams(request.app.state.redis, video_id)
 
-    return {"streams": fetched_streams}
+    # Rendered torrent streams are plain dicts, so skip the response model validation.
+    return ORJSONResponse(
+        {
+            "streams": [
+                stream
+                if isinstance(stream, dict)
+                else stream.model_dump(exclude_none=True)
+                for stream in fetched_streams
+            ]
+        },
+        headers=response.headers,
+    )
 
 
 @app.post("/encrypt-user-data", tags=["user_data"])
@@ -456,6 +508,16 @@ async def encrypt_user_data(user_data: schemas.UserData):
     return {"encrypted_str": encrypted_str}
 
 
+def get_poster_response(request: Request, digest: str, media_type: str) -> Response:
+    # The digest of the image content is a strong ETag.
+    headers = {**const.DEFAULT_HEADERS, "ETag": f'"{digest}"', "Vary": "Accept"}
+    if headers["ETag"] in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        poster_store.get_path(digest), media_type=media_type, headers=headers
+    )
+
+
 @app.get("/poster/{catalog_type}/{mediafusion_id}.jpg", tags=["poster"])
 @wrappers.exclude_rate_limit
 async def get_poster(
@@ -463,13 +525,21 @@ async def get_poster(
     mediafusion_id: str,
     request: Request,
 ):
-    cache_key = f"{catalog_type}_{mediafusion_id}.jpg"
+    # Serve a WebP variant to the clients accepting it
+    if settings.enable_webp_posters and "image/webp" in request.headers.get(
+        "accept", ""
+    ):
+        cache_key = f"{catalog_type}_{mediafusion_id}.webp"
+        image_format, media_type = "WEBP", "image/webp"
+    else:
+        cache_key = f"{catalog_type}_{mediafusion_id}.jpg"
+        image_format, media_type = "JPEG", "image/jpeg"
 
-    # Check if the poster is cached in Redis
-    cached_image = await request.app.state.redis.get(cache_key)
-    if cached_image:
-        image_byte_io = BytesIO(cached_image)
-        return StreamingResponse(image_byte_io, media_type="image/jpeg")
+    # Check if the poster is in the poster store
+    if digest := await poster_store.get(
+        request.app.state.redis, cache_key, tag=mediafusion_id
+    ):
+        return get_poster_response(request, digest, media_type)
 
     # Query the MediaFusion data
     if catalog_type == "movie":
@@ -493,17 +563,17 @@ async def get_poster(
 
     try:
         image_byte_io = await poster.create_poster(
-            mediafusion_data, request.app.state.redis
+            mediafusion_data, request.app.state.redis, image_format
         )
-        # Convert BytesIO to bytes for Redis
-        image_bytes = image_byte_io.getvalue()
-        # Save the generated image to Redis. expire in 7 days
-        await request.app.state.redis.set(cache_key, image_bytes, ex=604800)
-        image_byte_io.seek(0)
-
-        return StreamingResponse(
-            image_byte_io, media_type="image/jpeg", headers=const.DEFAULT_HEADERS
+        # Save the generated image to the poster store. expire in 7 days
+        digest = await poster_store.put(
+            request.app.state.redis,
+            cache_key,
+            image_byte_io.getvalue(),
+            ex=604800,
+            tag=mediafusion_id,
         )
+        return get_poster_response(request, digest, media_type)
     except asyncio.TimeoutError:
         logging.error("Poster generation timeout.")
         raise HTTPException(status_code=404, detail="Poster generation timeout.")
@@ -2,118 +2,213 @@ import hashlib
 import logging
 import os
 import signal
+from collections import OrderedDict
 from threading import Lock
-from typing import Callable, Optional
+from typing import Callable, NamedTuple
 
 import dramatiq
 from fastapi.requests import Request
 from fastapi.responses import Response
 from redis.asyncio import Redis
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.routing import Match
+from starlette.routing import Match, BaseRoute
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
 
 from db.config import settings
 from db.schemas import UserData
 from utils import crypto, const
+from utils.local_cache import LocalCache
 from utils.network import get_client_ip
+from utils.rate_limiter import RateLimiter
 
+# Decoded user data per secret_str, shared by the requests of this worker.
+user_data_cache = LocalCache(
+    settings.user_data_cache_max_bytes, settings.user_data_cache_ttl
+)
 
-async def find_route_handler(app, request: Request) -> Optional[Callable]:
-    for route in app.routes:
-        match, scope = route.matches(request.scope)
-        if match == Match.FULL:
-            request.scope["path_params"] = scope["path_params"]
-            request.scope["endpoint"] = route.endpoint
-            return route.endpoint
-    return None
 
+class RouteInfo(NamedTuple):
+    endpoint: Callable
+    auth_required: bool
+    exclude_rate_limit: bool
+    limit: int
+    window: int
+    scope: str
 
-class SecureLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        await self.custom_log(request, response)
-        return response
+
+class RouteResolver:
+    """
+    Resolves the route of a request before the routing of the app, with the
+    endpoint attributes read once per route and the recent paths cached.
+    """
+
+    def __init__(self, max_cached_paths: int = 10000):
+        self.max_cached_paths = max_cached_paths
+        # Routes are not hashable, they are kept by identity for the app lifetime.
+        self._route_infos: dict[int, RouteInfo] = {}
+        self._resolved_paths: OrderedDict[
+            tuple[str, str], tuple[RouteInfo, dict] | None
+        ] = OrderedDict()
+
+    def resolve(self, app, scope: Scope) -> tuple[RouteInfo, dict] | None:
+        cache_key = (scope["method"], scope["path"])
+        if cache_key in self._resolved_paths:
+            self._resolved_paths.move_to_end(cache_key)
+            return self._resolved_paths[cache_key]
+
+        resolved = None
+        for route in app.routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                resolved = (
+                    self.get_route_info(route),
+                    child_scope.get("path_params", {}),
+                )
+                break
+
+        self._resolved_paths[cache_key] = resolved
+        if len(self._resolved_paths) > self.max_cached_paths:
+            self._resolved_paths.popitem(last=False)
+        return resolved
+
+    def get_route_info(self, route: BaseRoute) -> RouteInfo:
+        route_info = self._route_infos.get(id(route))
+        if route_info is None:
+            endpoint = route.endpoint
+            route_info = RouteInfo(
+                endpoint=endpoint,
+                auth_required=getattr(endpoint, "auth_required", False),
+                exclude_rate_limit=getattr(endpoint, "exclude_rate_limit", False),
+                limit=getattr(endpoint, "limit", 50),  # Default rate limit
+                window=getattr(endpoint, "window", 60),
+                scope=getattr(endpoint, "scope", "default"),  # Default scope
+            )
+            self._route_infos[id(route)] = route_info
+        return route_info
+
+
+route_resolver = RouteResolver()
+
+
+def get_user_data(secret_str: str | None) -> UserData:
+    """
+    Returns the decrypted UserData of the secret_str, cached per worker.
+    The cached instance is shared between requests, so it must not be mutated.
+    """
+    if not secret_str:
+        return crypto.decrypt_user_data(secret_str)
+
+    cache_key = crypto.get_text_hash(secret_str, full_hash=True)
+    user_data = user_data_cache.get(cache_key)
+    if user_data is None:
+        user_data = crypto.decrypt_user_data(secret_str)
+        user_data_cache.set(cache_key, user_data, len(secret_str))
+    return user_data
+
+
+class SecureLoggingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = None
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        self.custom_log(Request(scope), status_code)
 
     @staticmethod
-    async def custom_log(request: Request, response: Response):
+    def custom_log(request: Request, status_code: int):
         ip = get_client_ip(request)
         url_path = str(request.url)
         if request.path_params.get("secret_str"):
             url_path = url_path.replace(
                 request.path_params.get("secret_str"), "***MASKED***"
             )
-        logging.info(
-            f'{ip} - "{request.method} {url_path} HTTP/1.1" {response.status_code}'
-        )
+        logging.info(f'{ip} - "{request.method} {url_path} HTTP/1.1" {status_code}')
+
 
+class UserDataMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        route_info = None
+        secret_str = None
+        if resolved := route_resolver.resolve(scope["app"], scope):
+            route_info, path_params = resolved
+            scope["path_params"] = dict(path_params)
+            scope["endpoint"] = route_info.endpoint
+            secret_str = path_params.get("secret_str")
+        scope["route_info"] = route_info
 
-class UserDataMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable):
-        endpoint = await find_route_handler(request.app, request)
-        secret_str = request.path_params.get("secret_str")
         # Decrypt and parse the UserData from secret_str
-        user_data = crypto.decrypt_user_data(secret_str)
+        user_data = get_user_data(secret_str)
 
         # validate api password if set
         if settings.api_password and settings.is_public_instance is False:
-            is_auth_required = getattr(endpoint, "auth_required", False)
+            is_auth_required = route_info is not None and route_info.auth_required
             if is_auth_required and user_data.api_password != settings.api_password:
-                return Response(
+                response = Response(
                     content="Unauthorized",
                     status_code=401,
                     headers=const.NO_CACHE_HEADERS,
                 )
+                return await response(scope, receive, send)
 
         # Attach UserData to request state for access in endpoints
-        request.scope["user"] = user_data
+        scope["user"] = user_data
 
-        try:
-            return await call_next(request)
-        except RuntimeError as exc:
-            if str(exc) == "No response returned." and await request.is_disconnected():
-                return Response(status_code=204)
-            raise
+        await self.app(scope, receive, send)
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, redis_client: Redis):
-        super().__init__(app)
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, redis_client: Redis):
+        self.app = app
         self.redis = redis_client
+        self.rate_limiter = RateLimiter(
+            redis_client, lease_size=settings.rate_limit_lease_size
+        )
 
-    async def dispatch(self, request: Request, call_next: Callable):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Skip rate limiting for exempt paths
-        if not settings.enable_rate_limit:
-            return await call_next(request)
-
-        # Retrieve the endpoint function from the request
-        endpoint = request.scope.get("endpoint")
-        if not endpoint:
-            return await call_next(request)
+        if scope["type"] != "http" or not settings.enable_rate_limit:
+            return await self.app(scope, receive, send)
 
-        is_exclude = getattr(endpoint, "exclude_rate_limit", False)
-        if is_exclude:
-            return await call_next(request)
+        # Retrieve the endpoint attributes resolved by the UserDataMiddleware
+        route_info: RouteInfo | None = scope.get("route_info")
+        if not route_info or route_info.exclude_rate_limit:
+            return await self.app(scope, receive, send)
 
-        limit = getattr(endpoint, "limit", 50)  # Default rate limit
-        window = getattr(endpoint, "window", 60)
-        scope = getattr(endpoint, "scope", "default")  # Default scope
-
-        ip = get_client_ip(request)
+        ip = get_client_ip(Request(scope))
 
         # Generate a unique key for rate limiting
-        identifier = self.generate_identifier(ip, request.user)
-        key = f"rate_limit:{identifier}:{scope}"
+        identifier = self.generate_identifier(ip, scope["user"])
+        key = f"rate_limit:{identifier}:{route_info.scope}"
 
         # Check and apply rate limit
-        allowed = await self.check_rate_limit_with_redis(key, limit, window)
+        allowed = await self.check_rate_limit_with_redis(
+            key, route_info.limit, route_info.window
+        )
         if not allowed:
-            return Response(
+            response = Response(
                 content="Rate limit exceeded",
                 status_code=429,
                 headers=const.NO_CACHE_HEADERS,
             )
+            return await response(scope, receive, send)
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
     @staticmethod
     def generate_identifier(ip: str, user_data: UserData) -> str:
@@ -130,16 +225,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         self, key: str, limit: int, window: int
     ) -> bool:
         try:
-            results = await (
-                self.redis.pipeline(transaction=True)
-                .incr(key)
-                .expire(key, window)
-                .execute()
-            )
-            current_count = results[0]
-            if current_count > limit:
-                return False  # Rate limit exceeded
-            return True
+            return await self.rate_limiter.acquire(key, limit, window)
         except Exception as e:
             # Log error but allow the request to proceed to avoid blocking legitimate requests
             logging.error(f"Rate limit error: {e}")
@@ -161,3 +247,48 @@ class MaxTasksPerChild(dramatiq.Middleware):
                 self.logger.warning("Counter reached zero. Signaling current process.")
                 os.kill(os.getppid(), getattr(signal, "SIGHUP", signal.SIGTERM))
                 self.signaled = True
+
+
+if __name__ == "__main__":
+    # Requests per second through the middleware stack on the cached endpoints,
+    # run with the Redis of the settings available: python -m api.middleware
+    import asyncio
+    import time
+
+    import httpx
+
+    from api.main import app
+
+    async def benchmark_endpoint(
+        client: httpx.AsyncClient, path: str, total: int = 2000, concurrency: int = 50
+    ):
+        async def worker(worker_id: int, count: int):
+            # A client IP per worker, to stay within the rate limit of the endpoint.
+            headers = {"X-Forwarded-For": f"10.0.0.{worker_id}"}
+            for _ in range(count):
+                response = await client.get(path, headers=headers)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(worker(i, total // concurrency) for i in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+        print(f"{path}: {total / elapsed:.0f} requests/sec")
+
+    async def main():
+        settings.enable_rate_limit = True
+        catalog_path = "/catalog/movie/mediafusion_search_movies.json"
+        await app.state.redis.set(
+            "movie_mediafusion_search_movies_0_None_catalog", '{"metas": []}'
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            for path in ("/manifest.json", catalog_path):
+                await benchmark_endpoint(client, path)
+        await app.state.redis.delete("movie_mediafusion_search_movies_0_None_catalog")
+
+    logging.disable(logging.INFO)
+    asyncio.run(main())
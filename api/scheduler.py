@@ -5,6 +5,7 @@ from apscheduler.triggers.cron import CronTrigger
 
 from db.config import settings
 from mediafusion_scrapy.task import run_spider
+from utils.poster_prewarm import prewarm_catalog_posters
 from utils.validation_helper import validate_tv_streams_in_db
 
 
@@ -122,3 +123,11 @@ def setup_scheduler(scheduler: AsyncIOScheduler):
             name="streambtw",
             kwargs={"spider_name": "streambtw"},
         )
+
+    # Schedule the prewarming of the catalog posters
+    if not settings.disable_prewarm_catalog_posters_scheduler:
+        scheduler.add_job(
+            prewarm_catalog_posters.send,
+            CronTrigger.from_crontab(settings.prewarm_catalog_posters_crontab),
+            name="prewarm_catalog_posters",
+        )
@@ -8,6 +8,7 @@ from scrapers import prowlarr  # noqa: F401
 from mediafusion_scrapy import task  # noqa: F401
 from utils import torrent
 from utils import validation_helper  # noqa: F401
+from utils import poster_prewarm  # noqa: F401
 from scrapers import tv  # noqa: F401
 
 
@@ -45,7 +45,7 @@ class Settings(BaseSettings):
     disable_mhdtvsports_scheduler: bool = False
     tamilultra_scheduler_crontab: str = "0 8 * * *"
     disable_tamilultra_scheduler: bool = False
-    validate_tv_streams_in_db_crontab: str = "0 */6 * * *"
+    validate_tv_streams_in_db_crontab: str = "*/10 * * * *"
     disable_validate_tv_streams_in_db: bool = False
     sport_video_scheduler_crontab: str = "*/20 * * * *"
     disable_sport_video_scheduler: bool = False
@@ -57,14 +57,63 @@ class Settings(BaseSettings):
     disable_crictime_scheduler: bool = False
     streambtw_scheduler_crontab: str = "*/15 * * * *"
     disable_streambtw_scheduler: bool = False
+    prewarm_catalog_posters_crontab: str = "30 */6 * * *"
+    disable_prewarm_catalog_posters_scheduler: bool = False
 
     # Time-related settings
     torrentio_search_interval_days: int = 3
     prowlarr_search_interval_hour: int = 24
     prowlarr_immediate_max_process: int = 10
     prowlarr_immediate_max_process_time: int = 15
+    stream_scrapers_deadline: int = 15
     meta_cache_ttl: int = 1800  # 30 minutes in seconds
     worker_max_tasks_per_child: int = 20
+    pipeline_batch_size: int = 100
+    pipeline_batch_interval: float = 0.5  # seconds
+    pipeline_concurrency: int = 4
+    imdb_concurrency: int = 4
+    imdb_cache_ttl: int = 30 * 24 * 60 * 60  # 30 days in seconds
+    imdb_negative_cache_ttl: int = 24 * 60 * 60  # 1 day in seconds
+
+    # Debrid HTTP connection pool settings
+    debrid_max_connections: int = 100
+    debrid_max_keepalive_connections: int = 20
+    debrid_keepalive_expiry: int = 30  # seconds
+    debrid_http2: bool = True
+
+    # Outbound HTTP connection pool settings, per upstream
+    http_client_max_connections: int = 100
+    http_client_max_keepalive_connections: int = 20
+    http_client_keepalive_expiry: int = 30  # seconds
+    http_client_dns_cache_ttl: int = 300  # 5 minutes in seconds
+    http_client_http2: bool = True
+
+    cached_status_ttl: int = 3600  # 1 hour in seconds
+    uncached_status_ttl: int = 600  # 10 minutes in seconds
+    compress_stream_cache: bool = False
+    local_cache_max_bytes: int = 32 * 1024 * 1024  # 32 MB per process
+    local_cache_ttl: int = 60  # 1 minute in seconds
+    user_data_cache_max_bytes: int = 4 * 1024 * 1024  # 4 MB per process
+    user_data_cache_ttl: int = 3600  # 1 hour in seconds
+    rate_limit_lease_size: int = 0
+    enable_title_search_index: bool = True
+    title_index_snapshot_path: str = "/tmp/mediafusion_title_index.json"
+    poster_store_path: str = "/tmp/mediafusion_posters"
+    poster_store_max_bytes: int = 1024 * 1024 * 1024  # 1 GB
+    poster_process_pool_workers: int = 0
+    enable_webp_posters: bool = False
+    poster_prewarm_url: str | None = None
+    poster_prewarm_pages: int = 2
+    poster_prewarm_concurrency: int = 10
+    poster_prewarm_host_concurrency: int = 2
+    poster_prewarm_host_interval: float = 0.5  # seconds
+    tv_stream_check_batch_size: int = 5000
+    tv_stream_check_concurrency: int = 50
+    tv_stream_check_host_concurrency: int = 4
+    tv_stream_check_deadline: float = 5  # seconds
+    tv_stream_check_interval: int = 6 * 60 * 60  # 6 hours in seconds
+    tv_stream_retry_interval: int = 15 * 60  # 15 minutes in seconds
+    tv_stream_max_check_interval: int = 7 * 24 * 60 * 60  # 7 days in seconds
 
     # Optional security settings
     api_password: str | None = None
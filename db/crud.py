@@ -1,12 +1,15 @@
+import asyncio
 import json
 import logging
-from typing import Optional
+from typing import Any, Callable, Coroutine, Optional
 from uuid import uuid4
 
-from beanie import WriteRules
+from beanie import PydanticObjectId, WriteRules
 from beanie.operators import In, Set
+from bson import DBRef
 from pydantic import ValidationError
-from pymongo.errors import DuplicateKeyError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from redis.asyncio import Redis
 
 from db import schemas
@@ -21,18 +24,26 @@ from db.models import (
     TVStreams,
     MediaFusionEventsMetaData,
 )
-from db.schemas import Stream, MetaIdProjection, TorrentStreamsList
+from db.schemas import Stream
 from scrapers.prowlarr import get_streams_from_prowlarr
 from scrapers.torrentio import get_streams_from_torrentio
-from utils import crypto
+from utils import crypto, stream_codec, local_cache, title_index, imdb_resolver
+from utils.lock import acquire_redis_lock, release_redis_lock
+from utils.poster_prewarm import prewarm_posters
+from utils.single_flight import single_flight, redis_single_flight
 from utils.parser import (
     parse_stream_data,
     get_catalogs,
-    search_imdb,
     parse_tv_stream_data,
     fetch_downloaded_info_hashes,
-    ia,
 )
+from utils.validation_helper import record_tv_channel_request
+
+# Keep references to the scrapers that outlive the request deadline.
+BACKGROUND_SCRAPER_TASKS: set[asyncio.Task] = set()
+
+# Best matches returned by a search.
+SEARCH_RESULTS_LIMIT = 100
 
 
 async def get_meta_list(
@@ -48,22 +59,22 @@ async def get_meta_list(
     else:
         meta_class = MediaFusionSeriesMetaData
 
-    query_conditions = []
-
     if is_watchlist_catalog:
         downloaded_info_hashes = await fetch_downloaded_info_hashes(user_data)
         if not downloaded_info_hashes:
             return []
-        query_conditions.append(In(meta_class.streams.id, downloaded_info_hashes))
+        meta_ids = await TorrentStreams.distinct(
+            "meta_id", {"_id": {"$in": downloaded_info_hashes}}
+        )
+        query_condition = In(
+            meta_class.id, [meta_id for meta_id in meta_ids if meta_id]
+        )
     else:
-        query_conditions.append(In(meta_class.streams.catalog, [catalog]))
+        query_condition = meta_class.catalogs == catalog
 
     meta_list = (
-        await meta_class.find(
-            *query_conditions,
-            fetch_links=True,
-        )
-        .sort(-meta_class.streams.created_at)
+        await meta_class.find(query_condition)
+        .sort(-meta_class.latest_stream_created_at)
         .skip(skip)
         .limit(limit)
         .project(schemas.Meta)
@@ -108,36 +119,43 @@ async def get_movie_data_by_id(
     movie_id: str, redis: Redis
 ) -> Optional[MediaFusionMovieMetaData]:
     # Check if the movie data is already in the cache
-    cached_data = await redis.get(f"movie_data:{movie_id}")
+    cached_data = await local_cache.get_cached_value(
+        redis,
+        f"movie_data:{movie_id}",
+        MediaFusionMovieMetaData.model_validate_json,
+        tag=movie_id,
+    )
     if cached_data:
-        return MediaFusionMovieMetaData.model_validate_json(cached_data)
+        return cached_data
 
     movie_data = await MediaFusionMovieMetaData.get(movie_id)
     # store it in the db for feature reference.
     if not movie_data and movie_id.startswith("tt"):
-        try:
-            movie = ia.get_movie(movie_id.removeprefix("tt"), info="main")
-        except Exception:
+        movie = await imdb_resolver.get_imdb_title(movie_id)
+        if movie is None:
             return None
 
         movie_data = MediaFusionMovieMetaData(
             id=movie_id,
-            title=movie.get("title"),
-            year=movie.get("year"),
-            poster=movie.get("full-size cover url"),
-            background=movie.get("full-size cover url"),
+            title=movie["title"],
+            year=movie["year"],
+            poster=movie["poster"],
+            background=movie["poster"],
             streams=[],
-            description=movie.get("plot outline"),
+            description=movie["description"],
         )
         await movie_data.save()
         logging.info("Added metadata for movie %s", movie_data.title)
 
     # Serialize the data and store it in the Redis cache for 1 day
     if movie_data:
-        await redis.set(
+        await local_cache.set_cached_value(
+            redis,
             f"movie_data:{movie_id}",
             movie_data.model_dump_json(exclude_none=True),
+            movie_data,
             ex=86400,
+            tag=movie_id,
         )
     return movie_data
 
@@ -150,19 +168,18 @@ async def get_series_data_by_id(
     )
 
     if not series_data and series_id.startswith("tt"):
-        try:
-            series = ia.get_movie(series_id.removeprefix("tt"), info="main")
-        except Exception:
+        series = await imdb_resolver.get_imdb_title(series_id)
+        if series is None:
             return None
 
         series_data = MediaFusionSeriesMetaData(
             id=series_id,
-            title=series.get("title"),
-            year=series.get("year"),
-            poster=series.get("full-size cover url"),
-            background=series.get("full-size cover url"),
+            title=series["title"],
+            year=series["year"],
+            poster=series["poster"],
+            background=series["poster"],
             streams=[],
-            description=series.get("plot outline"),
+            description=series["description"],
         )
         await series_data.save()
         logging.info("Added metadata for series %s", series_data.title)
@@ -177,6 +194,44 @@ async def get_tv_data_by_id(
     return tv_data
 
 
+def get_torrent_streams_cache_key(
+    video_id: str, season: Optional[int] = None, episode: Optional[int] = None
+) -> str:
+    return f"torrent_streams:{video_id}:{season}:{episode}"
+
+
+async def fetch_and_cache_torrent_streams(
+    redis: Redis,
+    cache_key: str,
+    video_id: str,
+    season: Optional[int] = None,
+    episode: Optional[int] = None,
+) -> bytes:
+    if season is not None and episode is not None:
+        streams = (
+            await TorrentStreams.find({"meta_id": video_id})
+            .find(
+                {
+                    "season.season_number": season,
+                    "season.episodes.episode_number": episode,
+                }
+            )
+            .sort(-TorrentStreams.updated_at)
+            .to_list()
+        )
+    else:
+        streams = (
+            await TorrentStreams.find({"meta_id": video_id})
+            .sort(-TorrentStreams.updated_at)
+            .to_list()
+        )
+
+    # Serialize the data and store it in the Redis cache for 30 minutes
+    cached_data = stream_codec.encode_streams(streams, settings.compress_stream_cache)
+    await redis.set(cache_key, cached_data, ex=1800)
+    return cached_data
+
+
 async def get_cached_torrent_streams(
     redis: Redis,
     video_id: str,
@@ -184,48 +239,125 @@ async def get_cached_torrent_streams(
     episode: Optional[int] = None,
 ) -> list[TorrentStreams]:
     # Create a unique key for Redis
-    cache_key = f"torrent_streams:{video_id}:{season}:{episode}"
+    cache_key = get_torrent_streams_cache_key(video_id, season, episode)
 
     # Try to get the data from the Redis cache
     cached_data = await redis.get(cache_key)
-
     if cached_data is not None:
-        # If the data is in the cache, deserialize it and return it
-        streams = TorrentStreamsList.model_validate_json(cached_data).streams
-    else:
-        # If the data is not in the cache, query it from the database
-        if season is not None and episode is not None:
-            streams = (
-                await TorrentStreams.find({"meta_id": video_id})
-                .find(
-                    {
-                        "season.season_number": season,
-                        "season.episodes.episode_number": episode,
-                    }
-                )
-                .sort(-TorrentStreams.updated_at)
-                .to_list()
-            )
-        else:
-            streams = (
-                await TorrentStreams.find({"meta_id": video_id})
-                .sort(-TorrentStreams.updated_at)
-                .to_list()
-            )
+        streams = stream_codec.decode_streams(cached_data)
+        if streams is not None:
+            return streams
+
+    # If the data is not in the cache, only one request per key queries the database,
+    # the concurrent ones wait for it. Every caller decodes its own stream objects
+    # since the cache status is set per user.
+    cached_data = await single_flight(
+        cache_key,
+        lambda: redis_single_flight(
+            redis,
+            cache_key,
+            compute=lambda: fetch_and_cache_torrent_streams(
+                redis, cache_key, video_id, season, episode
+            ),
+            load=lambda: redis.get(cache_key),
+        ),
+    )
+    return stream_codec.decode_streams(cached_data) or []
 
-        torrent_streams = TorrentStreamsList(streams=streams)
 
-        # Serialize the data and store it in the Redis cache for 30 minutes
-        await redis.set(
-            cache_key, torrent_streams.model_dump_json(exclude_none=True), ex=1800
-        )
+async def invalidate_on_late_streams(
+    scraper_task: asyncio.Task, redis: Redis, cache_key: str
+):
+    """
+    Waits for a scraper which missed the request deadline and drops the cached
+    streams once it found new ones, so the next request picks them up from the DB.
+    """
+    try:
+        new_streams = await scraper_task
+    except Exception as e:
+        logging.error("Error in background scraper: %s", e)
+        return
+    if new_streams:
+        await redis.delete(cache_key)
+
+
+async def fan_out_stream_sources(
+    redis: Redis,
+    video_id: str,
+    scrapers: list[Coroutine],
+    season: Optional[int] = None,
+    episode: Optional[int] = None,
+) -> list[TorrentStreams]:
+    """
+    Fetches the stored streams while running the scrapers concurrently.
+    Streams of the scrapers which answered within the per-request deadline are merged,
+    the late ones keep running in the background to fill the DB for the next request.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.stream_scrapers_deadline
+    scraper_tasks = [asyncio.create_task(scraper) for scraper in scrapers]
+
+    try:
+        streams = await get_cached_torrent_streams(redis, video_id, season, episode)
+        if scraper_tasks:
+            await asyncio.wait(scraper_tasks, timeout=max(0, deadline - loop.time()))
+    finally:
+        cache_key = get_torrent_streams_cache_key(video_id, season, episode)
+        for task in scraper_tasks:
+            if not task.done():
+                background_task = asyncio.create_task(
+                    invalidate_on_late_streams(task, redis, cache_key)
+                )
+                BACKGROUND_SCRAPER_TASKS.add(background_task)
+                background_task.add_done_callback(BACKGROUND_SCRAPER_TASKS.discard)
+
+    existing_info_hashes = {stream.id for stream in streams}
+    for task in scraper_tasks:
+        if not task.done():
+            continue
+        if task.exception():
+            logging.error("Error in scraper for %s: %s", video_id, task.exception())
+            continue
+        for stream in task.result():
+            if stream.id not in existing_info_hashes:
+                existing_info_hashes.add(stream.id)
+                streams.append(stream)
 
     return streams
 
 
+async def get_movie_streams_from_prowlarr(
+    redis: Redis, video_id: str
+) -> list[TorrentStreams]:
+    movie_metadata = await get_movie_data_by_id(video_id, redis)
+    if not movie_metadata:
+        return []
+    return await get_streams_from_prowlarr(
+        redis, [], video_id, "movie", movie_metadata.title, movie_metadata.year
+    )
+
+
+async def get_series_streams_from_prowlarr(
+    redis: Redis, video_id: str, season: int, episode: int
+) -> list[TorrentStreams]:
+    series_metadata = await get_series_data_by_id(video_id, False)
+    if not series_metadata:
+        return []
+    return await get_streams_from_prowlarr(
+        redis,
+        [],
+        video_id,
+        "series",
+        series_metadata.title,
+        series_metadata.year,
+        season,
+        episode,
+    )
+
+
 async def get_movie_streams(
     user_data, secret_str: str, redis: Redis, video_id: str
-) -> list[Stream]:
+) -> list[Stream | dict]:
     if video_id.startswith("dl"):
         if not video_id.endswith(user_data.streaming_provider.service):
             return []
@@ -236,32 +368,23 @@ async def get_movie_streams(
                 url=f"{settings.host_url}/streaming_provider/{secret_str}/delete_all",
             )
         ]
-    streams = await get_cached_torrent_streams(redis, video_id)
 
+    scrapers = []
     if video_id.startswith("tt"):
         if (
             settings.is_scrap_from_torrentio
             and "torrentio_streams" in user_data.selected_catalogs
         ):
-            streams = await get_streams_from_torrentio(
-                redis, streams, video_id, "movie"
-            )
+            scrapers.append(get_streams_from_torrentio(redis, [], video_id, "movie"))
         if (
             settings.prowlarr_api_key
             and "prowlarr_streams" in user_data.selected_catalogs
         ):
-            movie_metadata = await get_movie_data_by_id(video_id, redis)
-            if movie_metadata:
-                streams = await get_streams_from_prowlarr(
-                    redis,
-                    streams,
-                    video_id,
-                    "movie",
-                    movie_metadata.title,
-                    movie_metadata.year,
-                )
+            scrapers.append(get_movie_streams_from_prowlarr(redis, video_id))
 
-    return await parse_stream_data(streams, user_data, secret_str)
+    streams = await fan_out_stream_sources(redis, video_id, scrapers)
+
+    return await parse_stream_data(streams, user_data, secret_str, redis)
 
 
 async def get_series_streams(
@@ -271,41 +394,35 @@ async def get_series_streams(
     video_id: str,
     season: int,
     episode: int,
-) -> list[Stream]:
-    streams = await get_cached_torrent_streams(redis, video_id, season, episode)
-
+) -> list[dict]:
+    scrapers = []
     if video_id.startswith("tt"):
         if (
             settings.is_scrap_from_torrentio
             and "torrentio_streams" in user_data.selected_catalogs
         ):
-            streams = await get_streams_from_torrentio(
-                redis, streams, video_id, "series", season, episode
+            scrapers.append(
+                get_streams_from_torrentio(
+                    redis, [], video_id, "series", season, episode
+                )
             )
 
         if (
             settings.prowlarr_api_key
             and "prowlarr_streams" in user_data.selected_catalogs
         ):
-            series_metadata = await get_series_data_by_id(video_id, False)
-            if series_metadata:
-                streams = await get_streams_from_prowlarr(
-                    redis,
-                    streams,
-                    video_id,
-                    "series",
-                    series_metadata.title,
-                    series_metadata.year,
-                    season,
-                    episode,
-                )
+            scrapers.append(
+                get_series_streams_from_prowlarr(redis, video_id, season, episode)
+            )
+
+    streams = await fan_out_stream_sources(redis, video_id, scrapers, season, episode)
 
     matched_episode_streams = filter(
         lambda stream: stream.get_episode(season, episode), streams
     )
 
     return await parse_stream_data(
-        matched_episode_streams, user_data, secret_str, season, episode
+        matched_episode_streams, user_data, secret_str, redis, season, episode
     )
 
 
@@ -313,6 +430,7 @@ async def get_tv_streams(redis: Redis, video_id: str) -> list[Stream]:
     tv_streams = await TVStreams.find(
         {"meta_id": video_id, "is_working": True}
     ).to_list()
+    await record_tv_channel_request(redis, video_id)
 
     return await parse_tv_stream_data(tv_streams, redis)
 
@@ -418,46 +536,250 @@ async def get_tv_meta(meta_id: str):
     }
 
 
-async def save_movie_metadata(metadata: dict, is_imdb: bool = True):
-    # Try to get the existing movie
-    existing_movie = await MediaFusionMovieMetaData.find_one(
-        {"title": metadata["title"], "year": metadata.get("year")}, fetch_links=True
+def update_meta_stream_summary(
+    meta: MediaFusionMovieMetaData | MediaFusionSeriesMetaData,
+):
+    """
+    Recomputes the catalogs and the latest stream creation time of the meta
+    from its fetched streams, which are used to list the catalogs.
+    """
+    meta.catalogs = sorted(
+        {catalog for stream in meta.streams for catalog in stream.catalog}
+    )
+    meta.latest_stream_created_at = max(
+        (stream.created_at for stream in meta.streams), default=None
     )
 
-    if not existing_movie:
-        # If the movie doesn't exist in our DB, search for IMDb ID
-        if is_imdb:
-            imdb_data = search_imdb(metadata["title"], metadata.get("year"))
-        else:
-            imdb_data = {}
-        meta_id = imdb_data.get("imdb_id")
 
-        if meta_id:
-            # Check if the movie with the found IMDb ID already exists in our DB
-            existing_movie = await MediaFusionMovieMetaData.get(
-                meta_id, fetch_links=True
+async def backfill_meta_stream_summary(redis: Redis):
+    """
+    Fills the catalogs and the latest stream creation time of the metas
+    which were stored before these fields were denormalized.
+    """
+    acquired, lock = await acquire_redis_lock(
+        redis, "backfill_meta_stream_summary", timeout=3600
+    )
+    if not acquired:
+        return
+
+    try:
+        for meta_class in [MediaFusionMovieMetaData, MediaFusionSeriesMetaData]:
+            async for meta in meta_class.find(
+                {"latest_stream_created_at": {"$exists": False}}, fetch_links=True
+            ):
+                update_meta_stream_summary(meta)
+                await meta_class.find_one({"_id": meta.id}).update(
+                    Set(
+                        {
+                            meta_class.catalogs: meta.catalogs,
+                            meta_class.latest_stream_created_at: meta.latest_stream_created_at,
+                        }
+                    )
+                )
+            logging.info("Backfilled stream summary of %s", meta_class.__name__)
+    finally:
+        await release_redis_lock(lock)
+
+
+async def torrent_stream_exists(info_hash: str) -> bool:
+    return (
+        await TorrentStreams.get_motor_collection().find_one(
+            {"_id": info_hash}, {"_id": 1}
+        )
+        is not None
+    )
+
+
+async def get_stored_info_hashes(info_hashes: list[str]) -> set[str]:
+    stored_streams = (
+        await TorrentStreams.get_motor_collection()
+        .find({"_id": {"$in": info_hashes}}, {"_id": 1})
+        .to_list(None)
+    )
+    return {stream["_id"] for stream in stored_streams}
+
+
+def get_bulk_write_failed_indexes(error: BulkWriteError) -> set[int]:
+    """
+    Returns the indexes of the documents which were not written, the
+    duplicates are expected from concurrent writers.
+    """
+    failed_indexes = set()
+    for write_error in error.details["writeErrors"]:
+        if write_error["code"] != 11000:
+            logging.error("Failed to write document: %s", write_error["errmsg"])
+        failed_indexes.add(write_error["index"])
+    return failed_indexes
+
+
+async def add_streams_to_metas(
+    meta_class: type[MediaFusionMovieMetaData | MediaFusionSeriesMetaData],
+    streams_by_meta: dict[str, list[TorrentStreams]],
+) -> list[str]:
+    """
+    Inserts the streams and links them to their metas, without rewriting the
+    other streams of the metas: one bulk write for the streams and one for the
+    metas. Returns the ids of the metas which got new streams, the streams
+    which are already stored are skipped.
+    """
+    meta_streams = [
+        (meta_id, stream)
+        for meta_id, streams in streams_by_meta.items()
+        for stream in streams
+    ]
+    if not meta_streams:
+        return []
+
+    failed_indexes = set()
+    try:
+        await TorrentStreams.insert_many(
+            [stream for _, stream in meta_streams], ordered=False
+        )
+    except BulkWriteError as e:
+        failed_indexes = get_bulk_write_failed_indexes(e)
+
+    new_streams_by_meta = {}
+    for index, (meta_id, stream) in enumerate(meta_streams):
+        if index not in failed_indexes:
+            new_streams_by_meta.setdefault(meta_id, []).append(stream)
+    if not new_streams_by_meta:
+        return []
+
+    stream_collection = TorrentStreams.get_collection_name()
+    await meta_class.get_motor_collection().bulk_write(
+        [
+            UpdateOne(
+                {"_id": meta_id},
+                {
+                    "$addToSet": {
+                        "streams": {
+                            "$each": [
+                                DBRef(stream_collection, stream.id)
+                                for stream in streams
+                            ]
+                        },
+                        "catalogs": {
+                            "$each": list(
+                                {
+                                    catalog
+                                    for stream in streams
+                                    for catalog in stream.catalog
+                                }
+                            )
+                        },
+                    },
+                    "$max": {
+                        "latest_stream_created_at": max(
+                            stream.created_at for stream in streams
+                        )
+                    },
+                },
             )
+            for meta_id, streams in new_streams_by_meta.items()
+        ],
+        ordered=False,
+    )
+    logging.info(
+        "Added %d streams to %d %s",
+        len(meta_streams) - len(failed_indexes),
+        len(new_streams_by_meta),
+        meta_class.__name__,
+    )
+    return list(new_streams_by_meta)
+
+
+async def add_stream_to_meta(
+    meta_class: type[MediaFusionMovieMetaData | MediaFusionSeriesMetaData],
+    meta_id: str,
+    stream: TorrentStreams,
+) -> bool:
+    """
+    Inserts the stream and links it to its meta. Returns False if the stream
+    is already stored.
+    """
+    return bool(await add_streams_to_metas(meta_class, {meta_id: [stream]}))
+
+
+async def group_new_streams(
+    items: list[dict], get_meta_key: Callable[[dict], Any]
+) -> dict[Any, list[dict]]:
+    """
+    Groups the items of the streams which are not stored yet by their meta,
+    with a single lookup of their info hashes.
+    """
+    stored_info_hashes = await get_stored_info_hashes(
+        [item["info_hash"] for item in items]
+    )
+    groups = {}
+    for item in items:
+        if item["info_hash"] in stored_info_hashes:
+            continue
+        stored_info_hashes.add(item["info_hash"])
+        groups.setdefault(get_meta_key(item), []).append(item)
+    return groups
+
+
+async def resolve_metas(
+    groups: dict[Any, list[dict]],
+    stored_meta_ids: dict[Any, str],
+    create_meta: Callable[[dict, dict], Coroutine[Any, Any, Optional[str]]],
+    media_type: str,
+    concurrency: int,
+) -> dict[str, list[dict]]:
+    """
+    Resolves the meta of each group of items once. The groups without a
+    stored meta are searched on IMDb in one batch, then their metas are
+    created up to concurrency at once. Returns the items of each resolved
+    meta id, in their order.
+    """
+    items_by_meta = {}
+    new_groups = []
+    for key, group_items in groups.items():
+        if key in stored_meta_ids:
+            items_by_meta.setdefault(stored_meta_ids[key], []).extend(group_items)
         else:
-            meta_id = f"mf{uuid4().fields[-1]}"
-        # Update the poster from IMDb if available
-        poster = imdb_data.get("poster") or metadata["poster"]
-        background = imdb_data.get("background") or metadata["poster"]
-    else:
-        poster = existing_movie.poster
-        background = existing_movie.background
-        meta_id = existing_movie.id
+            new_groups.append(group_items)
+
+    imdb_results = await imdb_resolver.resolve_titles(
+        [
+            (group_items[0]["title"], group_items[0].get("year"))
+            for group_items in new_groups
+            if group_items[0].get("is_imdb", True)
+        ],
+        media_type,
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve_meta(metadata: dict) -> Optional[str]:
+        imdb_data = imdb_results.get((metadata["title"], metadata.get("year")), {})
+        async with semaphore:
+            return await create_meta(metadata, imdb_data)
+
+    results = await asyncio.gather(
+        *(resolve_meta(group_items[0]) for group_items in new_groups),
+        return_exceptions=True,
+    )
+    for group_items, result in zip(new_groups, results):
+        if isinstance(result, Exception):
+            logging.error("Error storing %s: %s", group_items[0]["title"], result)
+        elif result:
+            items_by_meta.setdefault(result, []).extend(group_items)
+    return items_by_meta
+
 
+def get_languages(metadata: dict) -> list[str]:
     if "language" in metadata:
-        languages = (
+        return (
             [metadata["language"]]
             if isinstance(metadata["language"], str)
             else metadata["language"]
         )
-    else:
-        languages = [metadata["scrap_language"]]
+    return [metadata["scrap_language"]]
+
 
-    # Create the stream object
-    new_stream = TorrentStreams(
+def build_movie_stream(metadata: dict, meta_id: str = None) -> TorrentStreams:
+    languages = get_languages(metadata)
+    return TorrentStreams(
         id=metadata["info_hash"],
         torrent_name=metadata["torrent_name"],
         announce_list=metadata["announce_list"],
@@ -476,83 +798,8 @@ async def save_movie_metadata(metadata: dict, is_imdb: bool = True):
         meta_id=meta_id,
     )
 
-    if existing_movie:
-        # Check if the stream with the same info_hash already exists
-        matching_stream = next(
-            (stream for stream in existing_movie.streams if stream.id == new_stream.id),
-            None,
-        )
-        if not matching_stream:
-            existing_movie.streams.append(new_stream)
-            logging.info(
-                "Updated movie %s. Total streams: %d",
-                existing_movie.title,
-                len(existing_movie.streams),
-            )
-            await existing_movie.save(link_rule=WriteRules.WRITE)
-    else:
-        # If the movie doesn't exist, create a new one
-        movie_data = MediaFusionMovieMetaData(
-            id=meta_id,
-            title=metadata["title"],
-            year=metadata["year"],
-            poster=poster,
-            background=background,
-            streams=[new_stream],
-            description=metadata.get("description"),
-            runtime=metadata.get("runtime"),
-            website=metadata.get("website"),
-            is_add_title_to_poster=metadata.get("is_add_title_to_poster", False),
-        )
-        try:
-            await movie_data.insert(link_rule=WriteRules.WRITE)
-        except DuplicateKeyError:
-            logging.warning("Duplicate movie found: %s", movie_data.title)
-        logging.info("Added movie %s", movie_data.title)
-
-
-async def save_series_metadata(metadata: dict):
-    # Try to get the existing series
-    series = await MediaFusionSeriesMetaData.find_one(
-        {"title": metadata["title"]}, fetch_links=True
-    )
-
-    if not series:
-        # If the series doesn't exist in our DB, search for IMDb ID
-        imdb_data = search_imdb(metadata["title"], metadata["year"])
-        meta_id = imdb_data.get("imdb_id")
-
-        if meta_id:
-            # Check if the series with the found IMDb ID already exists in our DB
-            series = await MediaFusionSeriesMetaData.get(meta_id, fetch_links=True)
-
-        if not series:
-            meta_id = meta_id or f"mf{uuid4().fields[-1]}"
-            poster = imdb_data.get("poster") or metadata["poster"]
-            background = imdb_data.get("background") or metadata["poster"]
-
-            # Create an initial entry for the series
-            series = MediaFusionSeriesMetaData(
-                id=meta_id,
-                title=metadata["title"],
-                year=metadata["year"],
-                poster=poster,
-                background=background,
-                streams=[],
-            )
-            await series.insert()
-            logging.info("Added series %s", series.title)
-
-    existing_stream = next(
-        (s for s in series.streams if s.id == metadata["info_hash"]),
-        None,
-    )
-    if existing_stream:
-        # If the stream already exists, return
-        logging.info("Stream already exists for series %s", series.title)
-        return
 
-    # Extract episodes
+def build_series_stream(metadata: dict, meta_id: str = None) -> TorrentStreams:
     episodes = [
         Episode(
             episode_number=file["episode"],
@@ -563,19 +810,8 @@ async def save_series_metadata(metadata: dict):
         for file in metadata["file_data"]
         if file["episode"]
     ]
-
-    # Determine languages
-    if "language" in metadata:
-        languages = (
-            [metadata["language"]]
-            if isinstance(metadata["language"], str)
-            else metadata["language"]
-        )
-    else:
-        languages = [metadata["scrap_language"]]
-
-    # Create the stream
-    stream = TorrentStreams(
+    languages = get_languages(metadata)
+    return TorrentStreams(
         id=metadata["info_hash"],
         torrent_name=metadata["torrent_name"],
         announce_list=metadata["announce_list"],
@@ -590,19 +826,237 @@ async def save_series_metadata(metadata: dict):
         catalog=get_catalogs(metadata["catalog"], languages),
         created_at=metadata["created_at"],
         season=Season(season_number=metadata["season"], episodes=episodes),
-        meta_id=series.id,
+        meta_id=meta_id,
+    )
+
+
+def build_streams(
+    items: list[dict], build_stream: Callable[[dict], TorrentStreams]
+) -> dict[str, TorrentStreams]:
+    """
+    Builds the stream of each item by info hash. The malformed items are
+    logged and skipped, so that they don't fail the rest of their batch.
+    """
+    streams = {}
+    for item in items:
+        try:
+            streams[item["info_hash"]] = build_stream(item)
+        except Exception as e:
+            logging.error("Skipping malformed stream %s: %s", item.get("title"), e)
+    return streams
+
+
+def get_streams_by_meta(
+    items_by_meta: dict[str, list[dict]], streams: dict[str, TorrentStreams]
+) -> dict[str, list[TorrentStreams]]:
+    streams_by_meta = {}
+    for meta_id, meta_items in items_by_meta.items():
+        for item in meta_items:
+            stream = streams[item["info_hash"]]
+            stream.meta_id = meta_id
+            streams_by_meta.setdefault(meta_id, []).append(stream)
+    return streams_by_meta
+
+
+async def get_stored_movie_ids(
+    keys: list[tuple[str, Optional[int]]]
+) -> dict[tuple[str, Optional[int]], str]:
+    """
+    Returns the ids of the stored movies by title and year, in one query.
+    """
+    if not keys:
+        return {}
+    movies = (
+        await MediaFusionMovieMetaData.find(
+            {"$or": [{"title": title, "year": year} for title, year in keys]}
+        )
+        .project(schemas.MetaTitleProjection)
+        .to_list()
+    )
+    return {(movie.title, movie.year): movie.id for movie in movies}
+
+
+async def get_stored_series_ids(titles: list[str]) -> dict[str, str]:
+    """
+    Returns the ids of the stored series by title, in one query.
+    """
+    if not titles:
+        return {}
+    series = (
+        await MediaFusionSeriesMetaData.find(
+            In(MediaFusionSeriesMetaData.title, titles)
+        )
+        .project(schemas.MetaTitleProjection)
+        .to_list()
+    )
+    return {series_item.title: series_item.id for series_item in series}
+
+
+async def create_movie_meta(metadata: dict, imdb_data: dict) -> Optional[str]:
+    """
+    Creates the movie of the metadata with its IMDb data, if any. Returns the
+    id of the movie, which may already be stored under the IMDb id.
+    """
+    meta_id = imdb_data.get("imdb_id")
+
+    if meta_id:
+        # Check if the movie with the found IMDb ID already exists in our DB
+        if await MediaFusionMovieMetaData.get(meta_id):
+            return meta_id
+    else:
+        meta_id = f"mf{uuid4().fields[-1]}"
+
+    # Update the poster from IMDb if available
+    movie_data = MediaFusionMovieMetaData(
+        id=meta_id,
+        title=metadata["title"],
+        year=metadata["year"],
+        poster=imdb_data.get("poster") or metadata["poster"],
+        background=imdb_data.get("background") or metadata["poster"],
+        streams=[],
+        description=metadata.get("description"),
+        runtime=metadata.get("runtime"),
+        website=metadata.get("website"),
+        is_add_title_to_poster=metadata.get("is_add_title_to_poster", False),
     )
+    try:
+        await movie_data.insert()
+    except DuplicateKeyError:
+        # Created meanwhile by another group of the batch or another scraper.
+        existing_movie = await MediaFusionMovieMetaData.find_one(
+            {
+                "$or": [
+                    {"_id": meta_id},
+                    {"title": movie_data.title, "year": movie_data.year},
+                ]
+            }
+        ).project(schemas.MetaIdProjection)
+        if existing_movie:
+            return existing_movie.id
+        logging.warning("Duplicate movie found: %s", movie_data.title)
+        return None
+    logging.info("Added movie %s", movie_data.title)
+    await title_index.publish_title(movie_data)
+    prewarm_posters.send([["movie", meta_id, movie_data.poster]])
+    return meta_id
+
+
+async def create_series_meta(metadata: dict, imdb_data: dict) -> Optional[str]:
+    """
+    Creates the series of the metadata with its IMDb data, if any. Returns the
+    id of the series, which may already be stored under the IMDb id.
+    """
+    meta_id = imdb_data.get("imdb_id")
+
+    # Check if the series with the found IMDb ID already exists in our DB
+    if meta_id and await MediaFusionSeriesMetaData.get(meta_id):
+        return meta_id
+
+    # Create an initial entry for the series
+    series = MediaFusionSeriesMetaData(
+        id=meta_id or f"mf{uuid4().fields[-1]}",
+        title=metadata["title"],
+        year=metadata["year"],
+        poster=imdb_data.get("poster") or metadata["poster"],
+        background=imdb_data.get("background") or metadata["poster"],
+        streams=[],
+    )
+    try:
+        await series.insert()
+    except DuplicateKeyError:
+        # Created meanwhile by another group of the batch or another scraper.
+        existing_series = await MediaFusionSeriesMetaData.find_one(
+            {
+                "$or": [
+                    {"_id": series.id},
+                    {"title": series.title, "year": series.year},
+                ]
+            }
+        ).project(schemas.MetaIdProjection)
+        if existing_series:
+            return existing_series.id
+        logging.warning("Duplicate series found: %s", series.title)
+        return None
+    logging.info("Added series %s", series.title)
+    await title_index.publish_title(series)
+    prewarm_posters.send([["series", series.id, series.poster]])
+    return series.id
+
+
+async def save_movie_streams(items: list[dict], concurrency: int = 1) -> list[str]:
+    """
+    Stores the streams of a batch of movies, returns the ids of the movies
+    which got new streams. Each movie is resolved once per title and year.
+    """
+    streams = build_streams(items, build_movie_stream)
+    groups = await group_new_streams(
+        [item for item in items if item.get("info_hash") in streams],
+        lambda item: (item["title"], item.get("year")),
+    )
+    items_by_meta = await resolve_metas(
+        groups,
+        await get_stored_movie_ids(list(groups)),
+        create_movie_meta,
+        "movie",
+        concurrency,
+    )
+    return await add_streams_to_metas(
+        MediaFusionMovieMetaData, get_streams_by_meta(items_by_meta, streams)
+    )
+
+
+async def save_series_streams(items: list[dict], concurrency: int = 1) -> list[str]:
+    """
+    Stores the streams of a batch of series, returns the ids of the series
+    which got new streams. Each series is resolved once per title.
+    """
+    streams = build_streams(items, build_series_stream)
+    groups = await group_new_streams(
+        [item for item in items if item.get("info_hash") in streams],
+        lambda item: item["title"],
+    )
+    items_by_meta = await resolve_metas(
+        groups,
+        await get_stored_series_ids(list(groups)),
+        create_series_meta,
+        "series",
+        concurrency,
+    )
+    return await add_streams_to_metas(
+        MediaFusionSeriesMetaData, get_streams_by_meta(items_by_meta, streams)
+    )
+
+
+async def save_movie_metadata(metadata: dict, is_imdb: bool = True) -> Optional[str]:
+    """
+    Stores the stream of the movie, returns the meta id if a new stream was added.
+    """
+    meta_ids = await save_movie_streams([{**metadata, "is_imdb": is_imdb}])
+    return meta_ids[0] if meta_ids else None
 
-    # Add the stream to the series
-    series.streams.append(stream)
 
-    await series.save(link_rule=WriteRules.WRITE)
-    logging.info("Updated series %s", series.title)
+async def save_series_metadata(metadata: dict) -> Optional[str]:
+    """
+    Stores the stream of the series, returns the meta id if a new stream was added.
+    """
+    meta_ids = await save_series_streams([metadata])
+    return meta_ids[0] if meta_ids else None
 
 
 async def process_search_query(
     search_query: str, catalog_type: str, redis: Redis
 ) -> dict:
+    """
+    Searches the metas by text score in one aggregation, when the title index
+    is not ready. The results are the same previews as the title index ones,
+    without the episodes of the series which are served by their meta.
+    Results are cached per normalized query.
+    """
+    search_query = " ".join(search_query.lower().split())
+    cache_key = f"search_results:{catalog_type}:{search_query}"
+    if cached_data := await local_cache.get_cached_value(redis, cache_key):
+        return cached_data
+
     if catalog_type == "movie":
         meta_class = MediaFusionMovieMetaData
     elif catalog_type == "tv":
@@ -612,27 +1066,26 @@ async def process_search_query(
 
     search_results = (
         await meta_class.find({"$text": {"$search": search_query}})
-        .project(MetaIdProjection)
+        .aggregate(
+            [
+                {"$addFields": {"score": {"$meta": "textScore"}}},
+                {"$sort": {"score": -1}},
+                {"$limit": SEARCH_RESULTS_LIMIT},
+                {"$project": title_index.SEARCH_META_PROJECTION},
+            ]
+        )
         .to_list()
     )
 
-    metas = []
-
-    for item in search_results:
-        # Use the appropriate function to get the meta data
-        if catalog_type == "movie":
-            meta = await get_movie_meta(item.id, redis)
-        elif catalog_type == "tv":
-            meta = await get_tv_meta(item.id)
-        else:
-            meta = await get_series_meta(item.id)
-
-        if not meta:
-            continue
-
-        metas.append(meta["meta"])
-
-    return {"metas": metas}
+    result = {
+        "metas": [
+            title_index.build_search_meta(catalog_type, item) for item in search_results
+        ]
+    }
+    await local_cache.set_cached_value(
+        redis, cache_key, json.dumps(result), result, ex=settings.meta_cache_ttl
+    )
+    return result
 
 
 async def get_stream_by_info_hash(info_hash: str) -> TorrentStreams | None:
@@ -640,9 +1093,9 @@ async def get_stream_by_info_hash(info_hash: str) -> TorrentStreams | None:
     return stream
 
 
-async def save_tv_channel_metadata(tv_metadata: schemas.TVMetaData) -> str:
-    channel_id = "mf" + crypto.get_text_hash(tv_metadata.title)
-
+def build_tv_channel(
+    channel_id: str, tv_metadata: schemas.TVMetaData
+) -> MediaFusionTVMetaData:
     # Prepare the genres list
     genres = list(
         filter(
@@ -650,75 +1103,154 @@ async def save_tv_channel_metadata(tv_metadata: schemas.TVMetaData) -> str:
             set(tv_metadata.genres + [tv_metadata.country, tv_metadata.tv_language]),
         )
     )
+    return MediaFusionTVMetaData(
+        id=channel_id,
+        title=tv_metadata.title,
+        poster=tv_metadata.poster,
+        background=tv_metadata.background,
+        country=tv_metadata.country,
+        tv_language=tv_metadata.tv_language,
+        logo=tv_metadata.logo,
+        genres=genres,
+        type="tv",
+        streams=[],
+    )
 
-    # Ensure the channel document is upserted
-    try:
-        await MediaFusionTVMetaData.find_one(
-            MediaFusionTVMetaData.id == channel_id
-        ).upsert(
-            Set({}),  # Update operation is a no-op for now
-            on_insert=MediaFusionTVMetaData(
-                id=channel_id,
-                title=tv_metadata.title,
-                poster=tv_metadata.poster,
-                background=tv_metadata.background,
-                country=tv_metadata.country,
-                tv_language=tv_metadata.tv_language,
-                logo=tv_metadata.logo,
-                genres=genres,
-                type="tv",
-                streams=[],
-            ),
-        )
-    except DuplicateKeyError:
-        pass
-
-    # Stream processing
-    stream_ids = []
-    for stream in tv_metadata.streams:
-        # Define stream document with meta_id
-        stream_doc = TVStreams(
-            url=stream.url,
-            name=stream.name,
-            behaviorHints=stream.behaviorHints.model_dump(exclude_none=True)
-            if stream.behaviorHints
-            else None,
-            ytId=stream.ytId,
-            source=stream.source,
-            country=stream.country,
-            meta_id=channel_id,
-        )
 
-        # Check if the stream exists (by URL or ytId) and upsert accordingly
-        existing_stream = await TVStreams.find_one(
-            TVStreams.url == stream.url,
-            TVStreams.ytId == stream.ytId,
+def build_tv_stream(channel_id: str, stream: schemas.TVStreams) -> TVStreams:
+    return TVStreams(
+        url=stream.url,
+        name=stream.name,
+        behaviorHints=stream.behaviorHints.model_dump(exclude_none=True)
+        if stream.behaviorHints
+        else None,
+        ytId=stream.ytId,
+        source=stream.source,
+        country=stream.country,
+        meta_id=channel_id,
+    )
+
+
+async def save_tv_channels_metadata(
+    tv_metadatas: list[schemas.TVMetaData],
+) -> list[str]:
+    """
+    Stores a batch of TV channels and their streams, returns the channel ids.
+    The channels and the streams which are not stored yet are inserted in
+    bulk, and the streams are linked to their channels with one bulk write.
+    """
+    channels = {}
+    channel_stream_keys = {}
+    new_streams = {}
+    for tv_metadata in tv_metadatas:
+        channel_id = "mf" + crypto.get_text_hash(tv_metadata.title)
+        try:
+            channel = channels.get(channel_id) or build_tv_channel(
+                channel_id, tv_metadata
+            )
+            # Streams are identified by their URL or ytId
+            streams = {
+                (stream.url, stream.ytId): build_tv_stream(channel_id, stream)
+                for stream in tv_metadata.streams
+            }
+        except Exception as e:
+            # Skipped, so that it doesn't fail the rest of the batch.
+            logging.error("Skipping malformed TV channel %s: %s", tv_metadata.title, e)
+            continue
+        channels[channel_id] = channel
+        channel_stream_keys.setdefault(channel_id, []).extend(streams)
+        for stream_key, stream in streams.items():
+            new_streams.setdefault(stream_key, stream)
+    if not channels:
+        return []
+
+    stored_channels = (
+        await MediaFusionTVMetaData.find(In(MediaFusionTVMetaData.id, list(channels)))
+        .project(schemas.MetaIdProjection)
+        .to_list()
+    )
+    stored_channel_ids = {channel.id for channel in stored_channels}
+    new_channels = [
+        channel
+        for channel_id, channel in channels.items()
+        if channel_id not in stored_channel_ids
+    ]
+    if new_channels:
+        try:
+            await MediaFusionTVMetaData.insert_many(new_channels, ordered=False)
+        except BulkWriteError as e:
+            failed_indexes = get_bulk_write_failed_indexes(e)
+            new_channels = [
+                channel
+                for index, channel in enumerate(new_channels)
+                if index not in failed_indexes
+            ]
+        if new_channels:
+            await title_index.publish_titles(new_channels)
+            prewarm_posters.send(
+                [["tv", channel.id, channel.poster] for channel in new_channels]
+            )
+
+    # Check which streams exist, by their exact URL and ytId pair so that the
+    # lookup uses the (url, ytId) index.
+    stream_ids = {}
+    if new_streams:
+        async for stream in TVStreams.get_motor_collection().find(
+            {"$or": [{"url": url, "ytId": yt_id} for url, yt_id in new_streams]},
+            {"url": 1, "ytId": 1},
+        ):
+            stream_key = (stream.get("url"), stream.get("ytId"))
+            if stream_key in new_streams:
+                stream_ids.setdefault(stream_key, stream["_id"])
+                del new_streams[stream_key]
+
+    if new_streams:
+        # The ids are set beforehand to tell the inserted streams on failures.
+        for stream in new_streams.values():
+            stream.id = PydanticObjectId()
+        failed_indexes = set()
+        try:
+            await TVStreams.insert_many(list(new_streams.values()), ordered=False)
+        except BulkWriteError as e:
+            failed_indexes = get_bulk_write_failed_indexes(e)
+        stream_ids.update(
+            (stream_key, stream.id)
+            for index, (stream_key, stream) in enumerate(new_streams.items())
+            if index not in failed_indexes
         )
-        if existing_stream:
-            stream_ids.append(existing_stream.id)
-        else:
-            inserted_stream = await stream_doc.insert()
-            stream_ids.append(inserted_stream.id)
-
-    # Update the TV channel with new stream links, if there are any new streams
-    if stream_ids:
-        await MediaFusionTVMetaData.find_one(
-            MediaFusionTVMetaData.id == channel_id
-        ).update(
+
+    # Update the TV channels with new stream links, if there are any new streams
+    stream_collection = TVStreams.get_collection_name()
+    channel_updates = [
+        UpdateOne(
+            {"_id": channel_id},
             {
                 "$addToSet": {
                     "streams": {
                         "$each": [
-                            TVStreams.link_from_id(stream_id)
-                            for stream_id in stream_ids
+                            DBRef(stream_collection, stream_ids[stream_key])
+                            for stream_key in stream_keys
+                            if stream_key in stream_ids
                         ]
                     }
                 }
-            }
+            },
+        )
+        for channel_id, stream_keys in channel_stream_keys.items()
+        if stream_keys
+    ]
+    if channel_updates:
+        await MediaFusionTVMetaData.get_motor_collection().bulk_write(
+            channel_updates, ordered=False
         )
 
-    logging.info(f"Processed TV channel {tv_metadata.title}")
-    return channel_id
+    logging.info("Processed %d TV channels", len(channels))
+    return list(channels)
+
+
+async def save_tv_channel_metadata(tv_metadata: schemas.TVMetaData) -> str:
+    channel_ids = await save_tv_channels_metadata([tv_metadata])
+    return channel_ids[0]
 
 
 async def save_events_data(redis: Redis, metadata: dict) -> str:
@@ -783,6 +1315,13 @@ async def save_events_data(redis: Redis, metadata: dict) -> str:
     # Add the event key to a set of all events
     await redis.zadd("events:all", {event_key: event_start_timestamp})
 
+    # Render the poster of new events and of events with a new poster image
+    if not existing_event_json or existing_event_data.poster != events_data.poster:
+        prewarm_posters.send(
+            [["events", meta_id, events_data.poster]],
+            refresh=bool(existing_event_json),
+        )
+
     # Index the event by genre
     for genre in events_data.genres:
         await redis.zadd(f"events:genre:{genre}", {event_key: event_start_timestamp})
@@ -859,12 +1398,102 @@ async def get_genres(catalog_type: str, redis: Redis) -> list[str]:
     else:
         meta_class = MediaFusionSeriesMetaData
 
-    genres = await redis.get(f"{catalog_type}_genres")
+    genres = await local_cache.get_cached_value(redis, f"{catalog_type}_genres")
     if genres:
-        return json.loads(genres)
+        return genres
 
     genres = await meta_class.distinct("genres", {"genres": {"$ne": ""}})
 
     # cache the genres for 30 minutes
-    await redis.set(f"{catalog_type}_genres", json.dumps(genres), ex=1800)
+    await local_cache.set_cached_value(
+        redis, f"{catalog_type}_genres", json.dumps(genres), genres, ex=1800
+    )
     return genres
+
+
+if __name__ == "__main__":
+    from pymongo import monitoring
+
+    from db import database
+
+    class WriteCounter(monitoring.CommandListener):
+        """Counts the documents written by the insert, update and delete commands."""
+
+        WRITE_COMMANDS = {
+            "insert": "documents",
+            "update": "updates",
+            "delete": "deletes",
+        }
+
+        def __init__(self):
+            self.count = 0
+
+        def started(self, event):
+            if field := self.WRITE_COMMANDS.get(event.command_name):
+                self.count += len(event.command.get(field, []))
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+    def create_benchmark_stream(meta_id: str, index: int) -> TorrentStreams:
+        return TorrentStreams(
+            id=f"{meta_id}_{index}",
+            torrent_name=f"Benchmark S01 {index}",
+            size=1024,
+            announce_list=[],
+            languages=["English"],
+            source="benchmark",
+            catalog=["english_series"],
+            season=Season(
+                season_number=1, episodes=[Episode(episode_number=index % 10 + 1)]
+            ),
+            meta_id=meta_id,
+        )
+
+    async def benchmark(stream_counts=(10, 100, 1000)):
+        """
+        Writes per stream added to a series with stream_count streams, when the
+        series is saved with its links and when the stream is appended.
+        Run against a scratch database, the benchmark series are deleted after.
+        """
+        write_counter = WriteCounter()
+        monitoring.register(write_counter)
+        await database.init()
+
+        print(f"{'streams':>8} {'save with links':>16} {'append':>8}")
+        for stream_count in stream_counts:
+            meta_id = f"mfbenchmark{stream_count}"
+            series = MediaFusionSeriesMetaData(
+                id=meta_id,
+                title=f"MediaFusion Benchmark {stream_count}",
+                streams=[
+                    create_benchmark_stream(meta_id, index)
+                    for index in range(stream_count)
+                ],
+            )
+            await series.insert(link_rule=WriteRules.WRITE)
+            try:
+                series = await MediaFusionSeriesMetaData.get(meta_id, fetch_links=True)
+                series.streams.append(create_benchmark_stream(meta_id, stream_count))
+                update_meta_stream_summary(series)
+                write_counter.count = 0
+                await series.save(link_rule=WriteRules.WRITE)
+                save_writes = write_counter.count
+
+                write_counter.count = 0
+                if not await torrent_stream_exists(f"{meta_id}_{stream_count + 1}"):
+                    await add_stream_to_meta(
+                        MediaFusionSeriesMetaData,
+                        meta_id,
+                        create_benchmark_stream(meta_id, stream_count + 1),
+                    )
+                append_writes = write_counter.count
+                print(f"{stream_count:>8} {save_writes:>16} {append_writes:>8}")
+            finally:
+                await TorrentStreams.find({"meta_id": meta_id}).delete()
+                await series.delete()
+
+    asyncio.run(benchmark())
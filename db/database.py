@@ -11,10 +11,21 @@ from db.models import (
     TorrentStreams,
     TVStreams,
     MediaFusionTVMetaData,
+    IMDbTitle,
 )
 
 
-async def init():
+DOCUMENT_MODELS = [
+    MediaFusionMovieMetaData,
+    MediaFusionSeriesMetaData,
+    TorrentStreams,
+    TVStreams,
+    MediaFusionTVMetaData,
+    IMDbTitle,
+]
+
+
+async def init(allow_index_dropping: bool = False):
     retries = 5
     for i in range(retries):
         try:
@@ -25,14 +36,9 @@ async def init():
             # Init beanie with the Product document class
             await init_beanie(
                 database=client.get_default_database(),  # Note that the database needs to be passed as part of the URI
-                document_models=[
-                    MediaFusionMovieMetaData,
-                    MediaFusionSeriesMetaData,
-                    TorrentStreams,
-                    TVStreams,
-                    MediaFusionTVMetaData,
-                ],
+                document_models=DOCUMENT_MODELS,
                 multiprocessing_mode=True,
+                allow_index_dropping=allow_index_dropping,
             )
             logging.info("Database initialized successfully.")
             break
@@ -46,3 +52,69 @@ async def init():
             else:
                 logging.error("Failed to initialize database after several attempts.")
                 raise e
+
+    await report_index_status()
+
+
+async def report_index_status():
+    """
+    Logs the declared indexes which are missing in the database, the indexes
+    which are no longer declared and the indexes which have never been used.
+    """
+    collections = {}
+    for model in DOCUMENT_MODELS:
+        # Inherited documents share the collection and the indexes of the root document.
+        collection = model.get_motor_collection()
+        declared_indexes = collections.setdefault(collection.name, (collection, set()))[
+            1
+        ]
+        declared_indexes.update(
+            index.document["name"] for index in model.get_settings().indexes or []
+        )
+
+    for collection_name, (collection, declared_indexes) in collections.items():
+        try:
+            index_stats = await collection.aggregate([{"$indexStats": {}}]).to_list(
+                None
+            )
+        except Exception as e:
+            logging.warning("Unable to read indexes of %s: %s", collection_name, e)
+            continue
+
+        existing_indexes = {stats["name"]: stats for stats in index_stats}
+        for index_name in sorted(declared_indexes - existing_indexes.keys()):
+            logging.warning("Missing index %s on %s", index_name, collection_name)
+
+        for index_name, stats in sorted(existing_indexes.items()):
+            if index_name == "_id_":
+                continue
+            if index_name not in declared_indexes:
+                logging.warning(
+                    "Index %s on %s is not declared in the models. "
+                    "Run `python -m db.database --drop-undeclared-indexes` to drop it.",
+                    index_name,
+                    collection_name,
+                )
+            elif stats["accesses"]["ops"] == 0:
+                logging.info(
+                    "Index %s on %s has not been used since %s",
+                    index_name,
+                    collection_name,
+                    stats["accesses"]["since"],
+                )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Create the declared indexes and report the index usage."
+    )
+    parser.add_argument(
+        "--drop-undeclared-indexes",
+        action="store_true",
+        help="Drop the indexes which are not declared in the models.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(init(allow_index_dropping=args.drop_undeclared_indexes))
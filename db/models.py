@@ -4,7 +4,7 @@ from typing import Optional, Any
 import pymongo
 from beanie import Document, Link
 from pydantic import BaseModel, Field
-from pymongo import IndexModel, ASCENDING
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 
 class Episode(BaseModel):
@@ -43,6 +43,19 @@ class TorrentStreams(Document):
     cached: Optional[bool] = Field(default=False, exclude=True)
     meta_id: Optional[str] = None
 
+    class Settings:
+        indexes = [
+            IndexModel([("meta_id", ASCENDING), ("updated_at", DESCENDING)]),
+            IndexModel(
+                [
+                    ("meta_id", ASCENDING),
+                    ("season.season_number", ASCENDING),
+                    ("season.episodes.episode_number", ASCENDING),
+                    ("updated_at", DESCENDING),
+                ]
+            ),
+        ]
+
     def get_episode(self, season_number: int, episode_number: int) -> Optional[Episode]:
         """
         Returns the Episode object for the given season and episode number.
@@ -65,6 +78,18 @@ class TVStreams(Document):
     meta_id: Optional[str] = None
     country: str | None = None
     is_working: Optional[bool] = True
+    # Set by the health checks, see validate_tv_streams_in_db.
+    health_score: float = 1.0
+    failure_count: int = 0
+    last_checked_at: Optional[datetime] = None
+    next_check_at: Optional[datetime] = None
+
+    class Settings:
+        indexes = [
+            IndexModel([("meta_id", ASCENDING), ("is_working", ASCENDING)]),
+            IndexModel([("url", ASCENDING), ("ytId", ASCENDING)]),
+            IndexModel([("next_check_at", ASCENDING)]),
+        ]
 
 
 class MediaFusionMetaData(Document):
@@ -80,12 +105,18 @@ class MediaFusionMetaData(Document):
     description: Optional[str] = None
     runtime: Optional[str] = None
     website: Optional[str] = None
+    # Denormalized from the linked streams to serve the catalogs without a $lookup.
+    catalogs: list[str] = Field(default_factory=list)
+    latest_stream_created_at: Optional[datetime] = None
 
     class Settings:
         is_root = True
         indexes = [
             IndexModel([("title", ASCENDING), ("year", ASCENDING)], unique=True),
             IndexModel([("title", pymongo.TEXT)]),
+            IndexModel(
+                [("catalogs", ASCENDING), ("latest_stream_created_at", DESCENDING)]
+            ),
         ]
 
 
@@ -112,3 +143,24 @@ class MediaFusionEventsMetaData(MediaFusionMetaData):
     logo: Optional[str] = None
     genres: list[str] = Field(default_factory=list)
     streams: list[TVStreams]
+
+
+# A movie or series of the IMDb datasets, imported by utils/imdb_dataset.py.
+class IMDbTitle(Document):
+    id: str
+    title: str
+    year: Optional[int] = None
+    type: str
+    # The normalized primary, original and alternative titles, and their words.
+    titles: list[str]
+    words: list[str] = Field(default_factory=list)
+
+    class Settings:
+        indexes = [
+            IndexModel(
+                [("titles", ASCENDING), ("type", ASCENDING), ("year", ASCENDING)]
+            ),
+            IndexModel(
+                [("words", ASCENDING), ("type", ASCENDING), ("year", ASCENDING)]
+            ),
+        ]
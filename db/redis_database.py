@@ -0,0 +1,30 @@
+import asyncio
+import weakref
+
+from redis.asyncio import ConnectionPool, Redis
+
+from db.config import settings
+
+# The pooled connections belong to the event loop which opened them, so
+# each loop of the process gets its own client.
+_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, Redis
+] = weakref.WeakKeyDictionary()
+
+
+def get_redis() -> Redis:
+    """
+    Returns the shared Redis client of the process, for the code paths which
+    are not given a client, like the scrapers and the background actors.
+    """
+    loop = asyncio.get_running_loop()
+    redis = _clients.get(loop)
+    if redis is None:
+        redis = Redis(connection_pool=ConnectionPool.from_url(settings.redis_url))
+        _clients[loop] = redis
+    return redis
+
+
+async def close():
+    if redis := _clients.pop(asyncio.get_running_loop(), None):
+        await redis.aclose(close_connection_pool=True)
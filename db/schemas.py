@@ -170,6 +170,17 @@ class MetaIdProjection(BaseModel):
     id: str = Field(alias="_id")
 
 
+class MetaTitleProjection(BaseModel):
+    id: str = Field(alias="_id")
+    title: str
+    year: int | None = None
+
+
+class MetaPosterProjection(BaseModel):
+    id: str = Field(alias="_id")
+    poster: str | None = None
+
+
 class TVStreamsBehaviorHints(StreamBehaviorHints):
     is_redirect: bool = False
 
@@ -6,8 +6,9 @@ from uuid import uuid4
 
 import redis.asyncio as redis_async
 import scrapy
-from beanie import WriteRules
 from itemadapter import ItemAdapter
+from pydantic import ValidationError
+from pymongo import UpdateOne
 from scrapy import signals
 from scrapy.exceptions import DropItem
 from scrapy.http.request import NO_CALLBACK
@@ -22,7 +23,7 @@ from db.models import (
     Episode,
 )
 from db.schemas import TVMetaData
-from utils import torrent, const
+from utils import torrent, const, local_cache
 from utils.parser import convert_size_to_bytes
 
 
@@ -471,6 +472,13 @@ class FormulaParserPipeline:
 
 
 class QueueBasedPipeline:
+    """
+    Stores the items in the background, in batches of up to
+    pipeline_batch_size items collected for at most pipeline_batch_interval
+    seconds. The items of a batch are grouped by get_item_key, groups are
+    processed concurrently and the items of a group in order.
+    """
+
     def __init__(self):
         self.queue = asyncio.Queue()
         self.processing_task = None
@@ -497,13 +505,47 @@ class QueueBasedPipeline:
     async def process_queue(self):
         logging.info("Starting processing queue")
         while True:
-            item, spider = await self.queue.get()
+            batch = await self.get_batch()
             try:
-                await self.parse_item(item, spider)
+                await self.process_batch(batch)
             except Exception as e:
-                logging.error(f"Error processing item: {e}")
+                logging.error(f"Error processing batch: {e}")
             finally:
-                self.queue.task_done()
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def get_batch(self) -> list[tuple]:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + settings.pipeline_batch_interval
+        while len(batch) < settings.pipeline_batch_size:
+            try:
+                batch.append(
+                    await asyncio.wait_for(self.queue.get(), deadline - loop.time())
+                )
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def process_batch(self, batch: list[tuple]):
+        groups = {}
+        for item, spider in batch:
+            groups.setdefault(self.get_item_key(item), []).append((item, spider))
+
+        semaphore = asyncio.Semaphore(settings.pipeline_concurrency)
+
+        async def process_group(group: list[tuple]):
+            async with semaphore:
+                for item, spider in group:
+                    try:
+                        await self.parse_item(item, spider)
+                    except Exception as e:
+                        logging.error(f"Error processing item: {e}")
+
+        await asyncio.gather(*(process_group(group) for group in groups.values()))
+
+    def get_item_key(self, item):
+        return item.get("title")
 
     async def parse_item(self, item, spider):
         raise NotImplementedError
@@ -523,9 +565,7 @@ class FormulaStorePipeline(QueueBasedPipeline):
             logging.warning(f"title not found in item: {item}")
             raise DropItem(f"title not found in item: {item}")
 
-        series = await MediaFusionSeriesMetaData.find_one(
-            {"title": item["title"]}, fetch_links=True
-        )
+        series = await MediaFusionSeriesMetaData.find_one({"title": item["title"]})
 
         if not series:
             meta_id = f"mf{uuid4().fields[-1]}"
@@ -548,8 +588,7 @@ class FormulaStorePipeline(QueueBasedPipeline):
 
         meta_id = series.id
 
-        stream = next((s for s in series.streams if s.id == item["info_hash"]), None)
-        if stream is None:
+        if not await crud.torrent_stream_exists(item["info_hash"]):
             # Create the stream
             stream = TorrentStreams(
                 id=item["info_hash"],
@@ -569,28 +608,62 @@ class FormulaStorePipeline(QueueBasedPipeline):
                 meta_id=meta_id,
                 seeders=item["seeders"],
             )
-            # Add the stream to the series
-            series.streams.append(stream)
-            logging.info(
-                "Added stream %s to series %s", stream.torrent_name, series.title
-            )
+            streams = await TorrentStreams.find(
+                {"meta_id": meta_id, "season": {"$ne": None}}
+            ).to_list()
+            episode_numbers = {
+                existing_stream.id: self.get_episode_numbers(existing_stream)
+                for existing_stream in streams
+            }
+            self.organize_episodes([*streams, stream])
 
-        self.organize_episodes(series)
+            if await crud.add_stream_to_meta(
+                MediaFusionSeriesMetaData, meta_id, stream
+            ):
+                logging.info(
+                    "Added stream %s to series %s", stream.torrent_name, series.title
+                )
+                # Only the streams whose episodes were renumbered are rewritten.
+                updates = [
+                    UpdateOne(
+                        {"_id": existing_stream.id},
+                        {
+                            "$set": {
+                                "season.episodes": [
+                                    episode.model_dump()
+                                    for episode in existing_stream.season.episodes
+                                ],
+                                "updated_at": datetime.now(),
+                            }
+                        },
+                    )
+                    for existing_stream in streams
+                    if self.get_episode_numbers(existing_stream)
+                    != episode_numbers[existing_stream.id]
+                ]
+                if updates:
+                    await TorrentStreams.get_motor_collection().bulk_write(
+                        updates, ordered=False
+                    )
+                logging.info("Updated series %s", series.title)
+                await local_cache.invalidate_meta(self.redis, series.id)
 
-        await series.save(link_rule=WriteRules.WRITE)
-        logging.info("Updated series %s", series.title)
         await self.redis.sadd(item["scraped_info_hash_key"], item["info_hash"])
 
         return item
 
-    def organize_episodes(self, series):
+    @staticmethod
+    def get_episode_numbers(stream: TorrentStreams) -> list[tuple[str, int]]:
+        return [
+            (episode.filename, episode.episode_number)
+            for episode in stream.season.episodes
+        ]
+
+    @staticmethod
+    def organize_episodes(streams: list[TorrentStreams]):
         # Flatten all episodes from all streams and sort by release date
         all_episodes = sorted(
-            (
-                episode
-                for stream in series.streams
-                for episode in stream.season.episodes
-            ),
+            (episode for stream in streams for episode in stream.season.episodes),
             key=lambda e: (
                 e.released.date(),
                 e.filename,
@@ -609,21 +682,33 @@ class FormulaStorePipeline(QueueBasedPipeline):
             episode.episode_number = episode_number
 
         # Now distribute episodes back to their respective streams, ensuring they are in the correct order
-        for stream in series.streams:
+        for stream in streams:
             stream.season.episodes.sort(
                 key=lambda e: e.episode_number
             )  # Ensure episodes are ordered by episode number
 
 
 class TVStorePipeline(QueueBasedPipeline):
-    async def parse_item(self, item, spider):
-        if "title" not in item:
-            logging.warning(f"title not found in item: {item}")
-            raise DropItem(f"title not found in item: {item}")
-
-        tv_metadata = TVMetaData.model_validate(item)
-        await crud.save_tv_channel_metadata(tv_metadata)
-        return item
+    async def process_batch(self, batch: list[tuple]):
+        tv_metadatas = []
+        for item, spider in batch:
+            if "title" not in item:
+                logging.warning(f"title not found in item: {item}")
+                continue
+            try:
+                tv_metadatas.append(TVMetaData.model_validate(item))
+            except ValidationError as e:
+                logging.error(f"Error processing item: {e}")
+        try:
+            await crud.save_tv_channels_metadata(tv_metadatas)
+        except Exception as e:
+            # Store the channels one by one, so that only the failing ones are lost.
+            logging.error(f"Error storing TV channels, retrying one by one: {e}")
+            for tv_metadata in tv_metadatas:
+                try:
+                    await crud.save_tv_channels_metadata([tv_metadata])
+                except Exception as e:
+                    logging.error(f"Error storing {tv_metadata.title}: {e}")
 
 
 class TorrentDownloadAndParsePipeline:
@@ -748,26 +833,43 @@ class SportVideoParserPipeline:
 
 
 class MovieStorePipeline(QueueBasedPipeline):
-    async def parse_item(self, item, spider):
-        if "title" not in item:
-            raise DropItem(f"title not found in item: {item}")
+    def __init__(self):
+        super().__init__()
+        self.redis = redis_async.Redis.from_url(settings.redis_url)
 
-        if item.get("type") != "movie":
-            return item
+    async def close(self):
+        await super().close()
+        await self.redis.aclose()
 
-        await crud.save_movie_metadata(item, item.get("is_imdb", True))
-        return item
+    async def process_batch(self, batch: list[tuple]):
+        items = [
+            item
+            for item, spider in batch
+            if "title" in item and item.get("type") == "movie"
+        ]
+        meta_ids = await crud.save_movie_streams(items, settings.pipeline_concurrency)
+        for meta_id in meta_ids:
+            await local_cache.invalidate_meta(self.redis, meta_id)
 
 
 class SeriesStorePipeline(QueueBasedPipeline):
-    async def parse_item(self, item, spider):
-        if "title" not in item:
-            raise DropItem(f"title not found in item: {item}")
+    def __init__(self):
+        super().__init__()
+        self.redis = redis_async.Redis.from_url(settings.redis_url)
 
-        if item.get("type") != "series":
-            return item
-        await crud.save_series_metadata(item)
-        return item
+    async def close(self):
+        await super().close()
+        await self.redis.aclose()
+
+    async def process_batch(self, batch: list[tuple]):
+        items = [
+            item
+            for item, spider in batch
+            if "title" in item and item.get("type") == "series"
+        ]
+        meta_ids = await crud.save_series_streams(items, settings.pipeline_concurrency)
+        for meta_id in meta_ids:
+            await local_cache.invalidate_meta(self.redis, meta_id)
 
 
 class LiveEventStorePipeline(QueueBasedPipeline):
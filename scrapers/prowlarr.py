@@ -1,6 +1,5 @@
 import asyncio
 import logging
-from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 
 import PTN
@@ -18,8 +17,10 @@ from scrapers.helpers import (
     update_torrent_movie_streams_metadata,
 )
 from utils.const import UA_HEADER
+from utils.http_client import http_clients
 from utils.network import CircuitBreaker, batch_process_with_circuit_breaker
 from utils.parser import is_contain_18_plus_keywords
+from utils.single_flight import single_flight
 from utils.torrent import extract_torrent_metadata
 from utils.wrappers import worker_rate_limit
 
@@ -35,70 +36,99 @@ async def get_streams_from_prowlarr(
     episode: int = None,
 ):
     cache_key = f"{catalog_type}_{video_id}_{year}_{season}_{episode}_prowlarr_streams"
-    cached_data = await redis.get(cache_key)
-    if cached_data:
-        return streams
+    # Concurrent requests of this process share the running scrape.
+    new_streams = await single_flight(
+        cache_key,
+        lambda: scrap_streams_from_prowlarr(
+            redis, cache_key, video_id, catalog_type, title, year, season, episode
+        ),
+    )
+    # Copy the shared streams since the cache status is set per user.
+    streams.extend(stream.model_copy() for stream in new_streams)
+    return streams
 
-    if catalog_type == "movie":
-        if (
-            settings.prowlarr_immediate_max_process_time > 0
-            and settings.prowlarr_immediate_max_process > 0
-        ):
-            new_streams = await fetch_stream_data_with_timeout(
-                scrap_movies_streams_from_prowlarr, video_id, title, year
-            )
-            streams.extend(new_streams)
-            max_process = settings.prowlarr_immediate_max_process - len(new_streams)
-            if settings.prowlarr_live_title_search and max_process > 0:
+
+async def scrap_streams_from_prowlarr(
+    redis: Redis,
+    cache_key: str,
+    video_id: str,
+    catalog_type: str,
+    title: str,
+    year: int,
+    season: int = None,
+    episode: int = None,
+) -> list[TorrentStreams]:
+    # Claim the search interval before scraping, so the other workers
+    # skip the scrape while it is running.
+    is_claimed = await redis.set(
+        cache_key,
+        "True",
+        nx=True,
+        ex=int(timedelta(hours=settings.prowlarr_search_interval_hour).total_seconds()),
+    )
+    if not is_claimed:
+        return []
+
+    streams = []
+    try:
+        if catalog_type == "movie":
+            if (
+                settings.prowlarr_immediate_max_process_time > 0
+                and settings.prowlarr_immediate_max_process > 0
+            ):
                 new_streams = await fetch_stream_data_with_timeout(
-                    scrape_movie_title_streams_from_prowlarr,
-                    video_id,
-                    title,
-                    year,
-                    max_process,
+                    scrap_movies_streams_from_prowlarr, video_id, title, year
                 )
                 streams.extend(new_streams)
-        # run background task for title search to get more streams
-        background_movie_title_search.send(video_id, title, str(year))
-    elif catalog_type == "series":
-        if (
-            settings.prowlarr_immediate_max_process_time > 0
-            and settings.prowlarr_immediate_max_process > 0
-        ):
-            new_streams = await fetch_stream_data_with_timeout(
-                scrap_series_streams_from_prowlarr,
-                video_id,
-                title,
-                year,
-                season,
-                episode,
-            )
-            streams.extend(new_streams)
-            max_process = settings.prowlarr_immediate_max_process - len(new_streams)
-            if settings.prowlarr_live_title_search and max_process > 0:
+                max_process = settings.prowlarr_immediate_max_process - len(new_streams)
+                if settings.prowlarr_live_title_search and max_process > 0:
+                    new_streams = await fetch_stream_data_with_timeout(
+                        scrape_movie_title_streams_from_prowlarr,
+                        video_id,
+                        title,
+                        year,
+                        max_process,
+                    )
+                    streams.extend(new_streams)
+            # run background task for title search to get more streams
+            background_movie_title_search.send(video_id, title, str(year))
+        elif catalog_type == "series":
+            if (
+                settings.prowlarr_immediate_max_process_time > 0
+                and settings.prowlarr_immediate_max_process > 0
+            ):
                 new_streams = await fetch_stream_data_with_timeout(
-                    scrape_series_title_streams_from_prowlarr,
+                    scrap_series_streams_from_prowlarr,
                     video_id,
                     title,
                     year,
                     season,
                     episode,
-                    max_process,
                 )
                 streams.extend(new_streams)
-        background_series_title_search.send(
-            video_id=video_id,
-            title=title,
-            year=str(year),
-            season=str(season),
-            episode=str(episode),
-        )
-    # Cache the data for 24 hours
-    await redis.set(
-        cache_key,
-        "True",
-        ex=int(timedelta(hours=settings.prowlarr_search_interval_hour).total_seconds()),
-    )
+                max_process = settings.prowlarr_immediate_max_process - len(new_streams)
+                if settings.prowlarr_live_title_search and max_process > 0:
+                    new_streams = await fetch_stream_data_with_timeout(
+                        scrape_series_title_streams_from_prowlarr,
+                        video_id,
+                        title,
+                        year,
+                        season,
+                        episode,
+                        max_process,
+                    )
+                    streams.extend(new_streams)
+            background_series_title_search.send(
+                video_id=video_id,
+                title=title,
+                year=str(year),
+                season=str(season),
+                episode=str(episode),
+            )
+    except Exception:
+        # Let the next request retry the scrape.
+        await redis.delete(cache_key)
+        raise
 
     return streams
 
@@ -124,24 +154,21 @@ async def fetch_stream_data_with_timeout(func, *args):
     return []
 
 
-@asynccontextmanager
-async def get_prowlarr_client(timeout: int = 10):
+def get_prowlarr_client() -> httpx.AsyncClient:
     headers = {
         "accept": "application/json",
         "X-Api-Key": settings.prowlarr_api_key,
     }
-    async with httpx.AsyncClient(headers=headers, timeout=timeout) as client:
-        yield client
+    return http_clients.get_client("prowlarr", headers=headers, timeout=10)
 
 
 async def fetch_stream_data(
     url: str, params: dict, timeout: int = 120
 ) -> dict | list[dict]:
     """Fetch stream data asynchronously."""
-    async with get_prowlarr_client(timeout) as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()  # Will raise an exception for 4xx/5xx responses
-        return response.json()
+    response = await get_prowlarr_client().get(url, params=params, timeout=timeout)
+    response.raise_for_status()  # Will raise an exception for 4xx/5xx responses
+    return response.json()
 
 
 def should_retry_prowlarr_scrap(retries_so_far, exception) -> bool:
@@ -332,10 +359,9 @@ async def get_torrent_data_from_prowlarr(
         magnet = Magnet.from_string(download_url)
         return {"info_hash": magnet.infohash, "announce_list": magnet.tr}, False
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            download_url, follow_redirects=False, timeout=20, headers=UA_HEADER
-        )
+    # The download URLs are served by Prowlarr or redirect to the indexers.
+    client = http_clients.get_client("prowlarr_downloads", timeout=20)
+    response = await client.get(download_url, follow_redirects=False, headers=UA_HEADER)
 
     if response.status_code == 301:
         redirect_url = response.headers.get("Location")
@@ -14,7 +14,9 @@ from scrapers.helpers import (
     update_torrent_movie_streams_metadata,
 )
 from utils.const import UA_HEADER
+from utils.http_client import http_clients
 from utils.parser import convert_size_to_bytes, is_contain_18_plus_keywords
+from utils.single_flight import single_flight
 from utils.validation_helper import is_video_file
 
 
@@ -27,37 +29,59 @@ async def get_streams_from_torrentio(
     episode: int = None,
 ):
     cache_key = f"{catalog_type}_{video_id}_{season}_{episode}_torrentio_streams"
-    cached_data = await redis.get(cache_key)
-    if cached_data:
-        return streams
-
-    if catalog_type == "movie":
-        streams.extend(await scrap_movie_streams_from_torrentio(video_id, catalog_type))
-    elif catalog_type == "series":
-        streams.extend(
-            await scrap_series_streams_from_torrentio(
-                video_id, catalog_type, season, episode
-            )
-        )
+    # Concurrent requests of this process share the running scrape.
+    new_streams = await single_flight(
+        cache_key,
+        lambda: scrap_streams_from_torrentio(
+            redis, cache_key, video_id, catalog_type, season, episode
+        ),
+    )
+    # Copy the shared streams since the cache status is set per user.
+    streams.extend(stream.model_copy() for stream in new_streams)
+    return streams
+
 
-    # Cache the data for 24 hours
-    await redis.set(
+async def scrap_streams_from_torrentio(
+    redis: Redis,
+    cache_key: str,
+    video_id: str,
+    catalog_type: str,
+    season: int = None,
+    episode: int = None,
+) -> list[TorrentStreams]:
+    # Claim the search interval before scraping, so the other workers
+    # skip the scrape while it is running.
+    is_claimed = await redis.set(
         cache_key,
         "True",
+        nx=True,
         ex=int(timedelta(days=settings.torrentio_search_interval_days).total_seconds()),
     )
+    if not is_claimed:
+        return []
 
-    return streams
+    try:
+        if catalog_type == "movie":
+            return await scrap_movie_streams_from_torrentio(video_id, catalog_type)
+        elif catalog_type == "series":
+            return await scrap_series_streams_from_torrentio(
+                video_id, catalog_type, season, episode
+            )
+    except Exception:
+        # Let the next request retry the scrape.
+        await redis.delete(cache_key)
+        raise
+    return []
 
 
 async def fetch_stream_data(url: str) -> dict:
     """Fetch stream data asynchronously."""
-    async with httpx.AsyncClient(
-        headers=UA_HEADER, proxy=settings.scraper_proxy_url
-    ) as client:
-        response = await client.get(url, timeout=10)
-        response.raise_for_status()  # Will raise an exception for 4xx/5xx responses
-        return response.json()
+    client = http_clients.get_client(
+        "torrentio", headers=UA_HEADER, proxy=settings.scraper_proxy_url, timeout=10
+    )
+    response = await client.get(url)
+    response.raise_for_status()  # Will raise an exception for 4xx/5xx responses
+    return response.json()
 
 
 async def scrap_movie_streams_from_torrentio(
@@ -1,23 +1,23 @@
 from typing import Any
 
-from streaming_providers.debrid_client import DebridClient
+from streaming_providers.debrid_client import AsyncDebridClient
 from streaming_providers.exceptions import ProviderException
 
 
-class AllDebrid(DebridClient):
+class AllDebrid(AsyncDebridClient):
     BASE_URL = "https://api.alldebrid.com/v4"
     AGENT = "mediafusion"
 
-    def initialize_headers(self):
+    async def initialize_headers(self):
         self.headers = {"Authorization": f"Bearer {self.token}"}
 
-    def __del__(self):
+    async def disable_access_token(self):
         pass
 
     def _handle_service_specific_errors(self, error):
         pass
 
-    def _make_request(
+    async def _make_request(
         self,
         method: str,
         url: str,
@@ -29,12 +29,12 @@ class AllDebrid(DebridClient):
         params = params or {}
         params["agent"] = self.AGENT
         url = self.BASE_URL + url
-        return super()._make_request(
+        return await super()._make_request(
             method, url, data, params, is_return_none, is_expected_to_fail
         )
 
-    def add_magnet_link(self, magnet_link):
-        response_data = self._make_request(
+    async def add_magnet_link(self, magnet_link):
+        response_data = await self._make_request(
             "POST", f"/magnet/upload", data={"magnets[]": magnet_link}
         )
 
@@ -55,29 +55,31 @@ class AllDebrid(DebridClient):
             )
         return response_data
 
-    def get_user_torrent_list(self):
-        return self._make_request("GET", "/magnet/status")
+    async def get_user_torrent_list(self):
+        return await self._make_request("GET", "/magnet/status")
 
-    def get_torrent_info(self, magnet_id):
-        response = self._make_request("GET", "/magnet/status", params={"id": magnet_id})
+    async def get_torrent_info(self, magnet_id):
+        response = await self._make_request(
+            "GET", "/magnet/status", params={"id": magnet_id}
+        )
         return response.get("data", {}).get("magnets")
 
-    def get_torrent_instant_availability(self, magnet_links: list[str]):
-        response = self._make_request(
+    async def get_torrent_instant_availability(self, magnet_links: list[str]):
+        response = await self._make_request(
             "POST", "/magnet/instant", data={"magnets[]": magnet_links}
         )
         return response.get("data", {}).get("magnets", [])
 
-    def get_available_torrent(self, info_hash) -> dict[str, Any] | None:
-        available_torrents = self.get_user_torrent_list()
+    async def get_available_torrent(self, info_hash) -> dict[str, Any] | None:
+        available_torrents = await self.get_user_torrent_list()
         if not available_torrents.get("data"):
             return None
         for torrent in available_torrents["data"]["magnets"]:
             if torrent["hash"] == info_hash:
                 return torrent
 
-    def create_download_link(self, link):
-        response = self._make_request(
+    async def create_download_link(self, link):
+        response = await self._make_request(
             "GET",
             "/link/unlock",
             params={"link": link},
@@ -90,5 +92,7 @@ class AllDebrid(DebridClient):
             "transfer_error.mp4",
         )
 
-    def delete_torrent(self, magnet_id):
-        return self._make_request("GET", "/magnet/delete", params={"id": magnet_id})
+    async def delete_torrent(self, magnet_id):
+        return await self._make_request(
+            "GET", "/magnet/delete", params={"id": magnet_id}
+        )
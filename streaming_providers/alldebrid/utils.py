@@ -6,7 +6,7 @@ from streaming_providers.alldebrid.client import AllDebrid
 from streaming_providers.exceptions import ProviderException
 
 
-def get_direct_link_from_alldebrid(
+async def get_direct_link_from_alldebrid(
     info_hash: str,
     magnet_link: str,
     user_data: UserData,
@@ -14,46 +14,49 @@ def get_direct_link_from_alldebrid(
     max_retries=5,
     retry_interval=5,
 ) -> str:
-    ad_client = AllDebrid(token=user_data.streaming_provider.token)
-
-    # Check if the torrent already exists
-    torrent_info = ad_client.get_available_torrent(info_hash)
-    if torrent_info:
-        torrent_id = torrent_info.get("id")
-        if torrent_info["status"] == "Ready":
-            file_index = select_file_index_from_torrent(torrent_info, filename)
-            response = ad_client.create_download_link(
-                torrent_info["links"][file_index]["link"]
-            )
-            return response["data"]["link"]
-        elif torrent_info["statusCode"] == 7:
-            ad_client.delete_torrent(torrent_id)
-            raise ProviderException(
-                "Not enough seeders available for parse magnet link",
-                "transfer_error.mp4",
-            )
-    else:
-        # If torrent doesn't exist, add it
-        response_data = ad_client.add_magnet_link(magnet_link)
-        torrent_id = response_data["data"]["magnets"][0]["id"]
-
-    # Wait for download completion and get the direct link
-    torrent_info = ad_client.wait_for_status(
-        torrent_id, "Ready", max_retries, retry_interval
-    )
-    file_index = select_file_index_from_torrent(torrent_info, filename)
-    response = ad_client.create_download_link(torrent_info["links"][file_index]["link"])
-    return response["data"]["link"]
+    async with AllDebrid(token=user_data.streaming_provider.token) as ad_client:
+        # Check if the torrent already exists
+        torrent_info = await ad_client.get_available_torrent(info_hash)
+        if torrent_info:
+            torrent_id = torrent_info.get("id")
+            if torrent_info["status"] == "Ready":
+                file_index = select_file_index_from_torrent(torrent_info, filename)
+                response = await ad_client.create_download_link(
+                    torrent_info["links"][file_index]["link"]
+                )
+                return response["data"]["link"]
+            elif torrent_info["statusCode"] == 7:
+                await ad_client.delete_torrent(torrent_id)
+                raise ProviderException(
+                    "Not enough seeders available for parse magnet link",
+                    "transfer_error.mp4",
+                )
+        else:
+            # If torrent doesn't exist, add it
+            response_data = await ad_client.add_magnet_link(magnet_link)
+            torrent_id = response_data["data"]["magnets"][0]["id"]
+
+        # Wait for download completion and get the direct link
+        torrent_info = await ad_client.wait_for_status(
+            torrent_id, "Ready", max_retries, retry_interval
+        )
+        file_index = select_file_index_from_torrent(torrent_info, filename)
+        response = await ad_client.create_download_link(
+            torrent_info["links"][file_index]["link"]
+        )
+        return response["data"]["link"]
 
 
-def update_ad_cache_status(streams: list[TorrentStreams], user_data: UserData):
+async def update_ad_cache_status(streams: list[TorrentStreams], user_data: UserData):
     """Updates the cache status of streams based on AllDebrid's instant availability."""
 
     try:
-        ad_client = AllDebrid(token=user_data.streaming_provider.token)
-        instant_availability_data = ad_client.get_torrent_instant_availability(
-            [stream.id for stream in streams]
-        )
+        async with AllDebrid(token=user_data.streaming_provider.token) as ad_client:
+            instant_availability_data = (
+                await ad_client.get_torrent_instant_availability(
+                    [stream.id for stream in streams]
+                )
+            )
         for stream in streams:
             stream.cached = any(
                 torrent["instant"]
@@ -75,11 +78,11 @@ def select_file_index_from_torrent(torrent_info: dict[str, Any], filename: str)
     )
 
 
-def fetch_downloaded_info_hashes_from_ad(user_data: UserData) -> list[str]:
+async def fetch_downloaded_info_hashes_from_ad(user_data: UserData) -> list[str]:
     """Fetches the info_hashes of all torrents downloaded in the AllDebrid account."""
     try:
-        ad_client = AllDebrid(token=user_data.streaming_provider.token)
-        available_torrents = ad_client.get_user_torrent_list()
+        async with AllDebrid(token=user_data.streaming_provider.token) as ad_client:
+            available_torrents = await ad_client.get_user_torrent_list()
         if not available_torrents.get("data"):
             return []
         return [torrent["hash"] for torrent in available_torrents["data"]["magnets"]]
@@ -88,9 +91,9 @@ def fetch_downloaded_info_hashes_from_ad(user_data: UserData) -> list[str]:
         return []
 
 
-def delete_all_torrents_from_ad(user_data: UserData):
+async def delete_all_torrents_from_ad(user_data: UserData):
     """Deletes all torrents from the AllDebrid account."""
-    ad_client = AllDebrid(token=user_data.streaming_provider.token)
-    torrents = ad_client.get_user_torrent_list()
-    for torrent in torrents["data"]["magnets"]:
-        ad_client.delete_torrent(torrent["id"])
+    async with AllDebrid(token=user_data.streaming_provider.token) as ad_client:
+        torrents = await ad_client.get_user_torrent_list()
+        for torrent in torrents["data"]["magnets"]:
+            await ad_client.delete_torrent(torrent["id"])
@@ -0,0 +1,58 @@
+from redis.asyncio import Redis
+
+from db.config import settings
+
+# Providers whose instant availability is a property of the torrent itself and
+# not of the user account, so the result can be shared between users.
+SHARED_CACHE_STATUS_PROVIDERS = {
+    "alldebrid",
+    "debridlink",
+    "offcloud",
+    "premiumize",
+    "realdebrid",
+    "torbox",
+}
+
+
+def get_cache_status_key(service: str, info_hash: str) -> str:
+    return f"cache_status:{service}:{info_hash}"
+
+
+async def get_cached_status(
+    redis: Redis, service: str, info_hashes: list[str]
+) -> dict[str, bool]:
+    """
+    Returns the known instant availability of the given info hashes.
+    Info hashes which are not in the cache are left out of the result.
+    """
+    if not info_hashes:
+        return {}
+    cached_values = await redis.mget(
+        [get_cache_status_key(service, info_hash) for info_hash in info_hashes]
+    )
+    return {
+        info_hash: value == b"1"
+        for info_hash, value in zip(info_hashes, cached_values)
+        if value is not None
+    }
+
+
+async def store_cached_status(redis: Redis, service: str, statuses: dict[str, bool]):
+    """
+    Stores the instant availability of the given info hashes.
+    Cached torrents are kept longer than uncached ones since they rarely get evicted.
+    """
+    if not statuses:
+        return
+    async with redis.pipeline(transaction=False) as pipe:
+        for info_hash, is_cached in statuses.items():
+            pipe.set(
+                get_cache_status_key(service, info_hash),
+                b"1" if is_cached else b"0",
+                ex=(
+                    settings.cached_status_ttl
+                    if is_cached
+                    else settings.uncached_status_ttl
+                ),
+            )
+        await pipe.execute()
@@ -1,27 +1,72 @@
-import time
+import asyncio
+import logging
 import traceback
+from importlib.util import find_spec
+from json import JSONDecodeError
 
-import requests
-from requests import RequestException, JSONDecodeError
+import httpx
 
+from db.config import settings
 from streaming_providers.exceptions import ProviderException
 from utils import const
 
 
-class DebridClient:
+class AsyncDebridClient:
+    # Process-wide connection pools, one per provider class.
+    _http_clients: dict[str, httpx.AsyncClient] = {}
+    _background_tasks: set[asyncio.Task] = set()
+
     def __init__(self, token=None):
         self.token = token
         self.headers = {}
-        self.initialize_headers()
+        self.client = self.get_http_client()
+
+    async def __aenter__(self):
+        await self.initialize_headers()
+        return self
 
-    def __del__(self):
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.token:
-            try:
-                self.disable_access_token()
-            except ProviderException:
-                pass
+            # Revoke the access token off the request path.
+            task = asyncio.create_task(self._disable_access_token_silently())
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+    async def _disable_access_token_silently(self):
+        try:
+            await self.disable_access_token()
+        except ProviderException:
+            pass
+        except Exception as error:
+            logging.warning("Failed to disable access token: %s", error)
+
+    @classmethod
+    def get_http_client(cls) -> httpx.AsyncClient:
+        """
+        Return the shared HTTP client of this provider, creating it on first use.
+        """
+        client = cls._http_clients.get(cls.__name__)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=const.DEBRID_SERVER_TIMEOUT,
+                http2=settings.debrid_http2 and find_spec("h2") is not None,
+                limits=httpx.Limits(
+                    max_connections=settings.debrid_max_connections,
+                    max_keepalive_connections=settings.debrid_max_keepalive_connections,
+                    keepalive_expiry=settings.debrid_keepalive_expiry,
+                ),
+            )
+            cls._http_clients[cls.__name__] = client
+        return client
+
+    @classmethod
+    async def close_http_clients(cls):
+        clients = list(cls._http_clients.values())
+        cls._http_clients.clear()
+        for client in clients:
+            await client.aclose()
 
-    def _make_request(
+    async def _make_request(
         self,
         method: str,
         url: str,
@@ -30,31 +75,39 @@ class DebridClient:
         is_return_none=False,
         is_expected_to_fail=False,
     ) -> dict:
-        response = self._perform_request(method, url, data, params)
+        response = await self._perform_request(method, url, data, params)
         self._handle_errors(response, is_expected_to_fail)
         return self._parse_response(response, is_return_none)
 
-    def _perform_request(self, method, url, data, params):
+    async def _perform_request(self, method, url, data, params):
         try:
-            return requests.request(
+            return await self.client.request(
                 method,
                 url,
-                params=params,
-                data=data,
+                params=self._drop_none_values(params),
+                data=self._drop_none_values(data),
                 headers=self.headers,
-                timeout=const.DEBRID_SERVER_TIMEOUT,
             )
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise ProviderException("Request timed out.", "torrent_not_downloaded.mp4")
-        except requests.exceptions.ConnectionError:
+        except httpx.TransportError:
             raise ProviderException(
                 "Failed to connect to Debrid service.", "debrid_service_down_error.mp4"
             )
 
+    @staticmethod
+    def _drop_none_values(data):
+        """
+        httpx encodes None as an empty string, so drop them as requests used to do.
+        """
+        if not isinstance(data, dict):
+            return data
+        return {key: value for key, value in data.items() if value is not None}
+
     def _handle_errors(self, response, is_expected_to_fail):
         try:
             response.raise_for_status()
-        except RequestException as error:
+        except httpx.HTTPStatusError as error:
             if is_expected_to_fail:
                 return
             self._handle_service_specific_errors(error)
@@ -86,13 +139,13 @@ class DebridClient:
                 "api_error.mp4",
             )
 
-    def initialize_headers(self):
+    async def initialize_headers(self):
         raise NotImplementedError
 
-    def disable_access_token(self):
+    async def disable_access_token(self):
         raise NotImplementedError
 
-    def wait_for_status(
+    async def wait_for_status(
         self,
         torrent_id: str,
         target_status: str | int,
@@ -102,15 +155,15 @@ class DebridClient:
         """Wait for the torrent to reach a particular status."""
         retries = 0
         while retries < max_retries:
-            torrent_info = self.get_torrent_info(torrent_id)
+            torrent_info = await self.get_torrent_info(torrent_id)
             if torrent_info["status"] == target_status:
                 return torrent_info
-            time.sleep(retry_interval)
+            await asyncio.sleep(retry_interval)
             retries += 1
         raise ProviderException(
             f"Torrent did not reach {target_status} status.",
             "torrent_not_downloaded.mp4",
         )
 
-    def get_torrent_info(self, torrent_id):
+    async def get_torrent_info(self, torrent_id):
         raise NotImplementedError
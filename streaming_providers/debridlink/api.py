@@ -10,14 +10,14 @@ router = APIRouter()
 
 @router.get("/get-device-code")
 async def get_device_code():
-    dl_client = DebridLink()
-    return JSONResponse(
-        content=dl_client.get_device_code(), headers=const.NO_CACHE_HEADERS
-    )
+    async with DebridLink() as dl_client:
+        return JSONResponse(
+            content=await dl_client.get_device_code(), headers=const.NO_CACHE_HEADERS
+        )
 
 
 @router.post("/authorize")
 async def authorize(data: AuthorizeData):
-    dl_client = DebridLink()
-    response = dl_client.authorize(data.device_code)
+    async with DebridLink() as dl_client:
+        response = await dl_client.authorize(data.device_code)
     return JSONResponse(content=response, headers=const.NO_CACHE_HEADERS)
@@ -32,7 +32,7 @@ def select_file_index_from_torrent(
     return torrent_info["files"].index(largest_file)
 
 
-def get_direct_link_from_debridlink(
+async def get_direct_link_from_debridlink(
     info_hash: str,
     magnet_link: str,
     user_data: UserData,
@@ -41,42 +41,43 @@ def get_direct_link_from_debridlink(
     max_retries=5,
     retry_interval=5,
 ) -> str:
-    dl_client = DebridLink(token=user_data.streaming_provider.token)
-
-    torrent_info = dl_client.get_available_torrent(info_hash)
-    if not torrent_info:
-        torrent_id = dl_client.add_magent_link(magnet_link).get("id")
-        torrent_info = dl_client.get_torrent_info(torrent_id)
-    else:
-        torrent_id = torrent_info.get("id")
-
-    if not torrent_id:
-        raise ProviderException(
-            "Failed to add magnet link to DebridLink", "transfer_error.mp4"
-        )
-
-    if torrent_info.get("error"):
-        dl_client.delete_torrent(torrent_id)
-        raise ProviderException(
-            f"Torrent cannot be downloaded due to error: {torrent_info.get('errorString')}",
-            "transfer_error.mp4",
+    async with DebridLink(token=user_data.streaming_provider.token) as dl_client:
+        torrent_info = await dl_client.get_available_torrent(info_hash)
+        if not torrent_info:
+            torrent_id = (await dl_client.add_magent_link(magnet_link)).get("id")
+            torrent_info = await dl_client.get_torrent_info(torrent_id)
+        else:
+            torrent_id = torrent_info.get("id")
+
+        if not torrent_id:
+            raise ProviderException(
+                "Failed to add magnet link to DebridLink", "transfer_error.mp4"
+            )
+
+        if torrent_info.get("error"):
+            await dl_client.delete_torrent(torrent_id)
+            raise ProviderException(
+                f"Torrent cannot be downloaded due to error: {torrent_info.get('errorString')}",
+                "transfer_error.mp4",
+            )
+
+        torrent_info = await dl_client.wait_for_status(
+            torrent_id, 100, max_retries, retry_interval
         )
 
-    torrent_info = dl_client.wait_for_status(
-        torrent_id, 100, max_retries, retry_interval
-    )
-
     return get_download_link(torrent_info, filename, file_index)
 
 
-def update_dl_cache_status(streams: list[TorrentStreams], user_data: UserData):
+async def update_dl_cache_status(streams: list[TorrentStreams], user_data: UserData):
     """Updates the cache status of streams based on DebridLink's instant availability."""
 
     try:
-        dl_client = DebridLink(token=user_data.streaming_provider.token)
-        instant_availability_response = dl_client.get_torrent_instant_availability(
-            ",".join([stream.id for stream in streams])
-        )
+        async with DebridLink(token=user_data.streaming_provider.token) as dl_client:
+            instant_availability_response = (
+                await dl_client.get_torrent_instant_availability(
+                    ",".join([stream.id for stream in streams])
+                )
+            )
         for stream in streams:
             stream.cached = bool(stream.id in instant_availability_response["value"])
 
@@ -84,11 +85,11 @@ def update_dl_cache_status(streams: list[TorrentStreams], user_data: UserData):
         pass
 
 
-def fetch_downloaded_info_hashes_from_dl(user_data: UserData) -> list[str]:
+async def fetch_downloaded_info_hashes_from_dl(user_data: UserData) -> list[str]:
     """Fetches the info_hashes of all torrents downloaded in the DebridLink account."""
     try:
-        dl_client = DebridLink(token=user_data.streaming_provider.token)
-        available_torrents = dl_client.get_user_torrent_list()
+        async with DebridLink(token=user_data.streaming_provider.token) as dl_client:
+            available_torrents = await dl_client.get_user_torrent_list()
         if "error" in available_torrents:
             return []
         return [torrent["hashString"] for torrent in available_torrents["value"]]
@@ -97,9 +98,9 @@ def fetch_downloaded_info_hashes_from_dl(user_data: UserData) -> list[str]:
         return []
 
 
-def delete_all_torrents_from_dl(user_data: UserData):
+async def delete_all_torrents_from_dl(user_data: UserData):
     """Deletes all torrents from the DebridLink account."""
-    dl_client = DebridLink(token=user_data.streaming_provider.token)
-    torrents = dl_client.get_user_torrent_list()
-    for torrent in torrents["value"]:
-        dl_client.delete_torrent(torrent["id"])
+    async with DebridLink(token=user_data.streaming_provider.token) as dl_client:
+        torrents = await dl_client.get_user_torrent_list()
+        for torrent in torrents["value"]:
+            await dl_client.delete_torrent(torrent["id"])
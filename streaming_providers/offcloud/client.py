@@ -1,23 +1,23 @@
 from typing import Any
 
-from streaming_providers.debrid_client import DebridClient
+from streaming_providers.debrid_client import AsyncDebridClient
 from streaming_providers.exceptions import ProviderException
 from utils.validation_helper import is_video_file
 
 
-class OffCloud(DebridClient):
+class OffCloud(AsyncDebridClient):
     BASE_URL = "https://offcloud.com/api"
 
-    def initialize_headers(self):
+    async def initialize_headers(self):
         pass
 
-    def __del__(self):
+    async def disable_access_token(self):
         pass
 
     def _handle_service_specific_errors(self, error):
         pass
 
-    def _make_request(
+    async def _make_request(
         self,
         method: str,
         url: str,
@@ -29,12 +29,14 @@ class OffCloud(DebridClient):
         params = params or {}
         params["key"] = self.token
         url = self.BASE_URL + url
-        return super()._make_request(
+        return await super()._make_request(
             method, url, data, params, is_return_none, is_expected_to_fail
         )
 
-    def add_magent_link(self, magnet_link):
-        response_data = self._make_request("POST", "/cloud", data={"url": magnet_link})
+    async def add_magent_link(self, magnet_link):
+        response_data = await self._make_request(
+            "POST", "/cloud", data={"url": magnet_link}
+        )
 
         if "requestId" not in response_data:
             if "not_available" in response_data:
@@ -48,33 +50,35 @@ class OffCloud(DebridClient):
             )
         return response_data
 
-    def get_user_torrent_list(self):
-        return self._make_request("GET", "/cloud/history")
+    async def get_user_torrent_list(self):
+        return await self._make_request("GET", "/cloud/history")
 
-    def get_torrent_info(self, request_id):
-        response = self._make_request(
+    async def get_torrent_info(self, request_id):
+        response = await self._make_request(
             "POST", "/cloud/status", data={"requestIds": [request_id]}
         )
         return response.get("requests")[0] if response.get("requests") else {}
 
-    def get_torrent_instant_availability(self, magnet_links: list[str]):
-        response = self._make_request("POST", "/cache", data={"hashes": magnet_links})
+    async def get_torrent_instant_availability(self, magnet_links: list[str]):
+        response = await self._make_request(
+            "POST", "/cache", data={"hashes": magnet_links}
+        )
         return response.get("cachedItems", {})
 
-    def get_available_torrent(self, info_hash) -> dict[str, Any] | None:
-        available_torrents = self.get_user_torrent_list()
+    async def get_available_torrent(self, info_hash) -> dict[str, Any] | None:
+        available_torrents = await self.get_user_torrent_list()
         for torrent in available_torrents:
             if info_hash in torrent["originalLink"]:
                 return torrent
 
-    def explore_folder_links(self, request_id):
-        return self._make_request("GET", f"/cloud/explore/{request_id}")
+    async def explore_folder_links(self, request_id):
+        return await self._make_request("GET", f"/cloud/explore/{request_id}")
 
-    def create_download_link(self, request_id, torrent_info, filename):
+    async def create_download_link(self, request_id, torrent_info, filename):
         if torrent_info["isDirectory"] is False:
             return f"https://{torrent_info.get('server')}.offcloud.com/cloud/download/{request_id}/{torrent_info.get('fileName')}"
 
-        response = self.explore_folder_links(request_id)
+        response = await self.explore_folder_links(request_id)
         for link in response:
             if filename is None:
                 if is_video_file(link):
@@ -85,5 +89,5 @@ class OffCloud(DebridClient):
             "No matching file available for this torrent", "api_error.mp4"
         )
 
-    def delete_torrent(self, magnet_id):
+    async def delete_torrent(self, magnet_id):
         raise NotImplementedError
@@ -8,13 +8,13 @@ from streaming_providers.exceptions import ProviderException
 from streaming_providers.premiumize.client import Premiumize
 
 
-def create_or_get_folder_id(pm_client: Premiumize, info_hash: str):
-    folder_data = pm_client.get_folder_list()
+async def create_or_get_folder_id(pm_client: Premiumize, info_hash: str):
+    folder_data = await pm_client.get_folder_list()
     for folder in folder_data["content"]:
         if folder["name"] == info_hash:
             return folder["id"]
 
-    folder_data = pm_client.create_folder(info_hash)
+    folder_data = await pm_client.create_folder(info_hash)
     if folder_data.get("status") != "success":
         raise ProviderException(
             "Folder already created in meanwhile", "torrent_not_downloaded.mp4"
@@ -22,7 +22,7 @@ def create_or_get_folder_id(pm_client: Premiumize, info_hash: str):
     return folder_data.get("id")
 
 
-def get_direct_link_from_premiumize(
+async def get_direct_link_from_premiumize(
     info_hash: str,
     magnet_link: str,
     user_data: UserData,
@@ -31,45 +31,44 @@ def get_direct_link_from_premiumize(
     max_retries=5,
     retry_interval=5,
 ) -> str:
-    pm_client = Premiumize(token=user_data.streaming_provider.token)
-
-    # Check if the torrent already exists
-    torrent_info = pm_client.get_available_torrent(info_hash, torrent_name)
-    if torrent_info:
-        torrent_id = torrent_info.get("id")
-        if torrent_info["status"] == "error":
-            pm_client.delete_torrent(torrent_id)
-            raise ProviderException(
-                "Not enough seeders available for parse magnet link",
-                "transfer_error.mp4",
-            )
-    else:
-        # If torrent doesn't exist, add it
-        folder_id = create_or_get_folder_id(pm_client, info_hash)
-        response_data = pm_client.add_magent_link(magnet_link, folder_id)
-        if "id" not in response_data:
-            raise ProviderException(
-                "Failed to add magnet link to Real-Debrid", "transfer_error.mp4"
-            )
-        torrent_id = response_data["id"]
-
-    # Wait for file selection and then start torrent download
-    torrent_info = pm_client.wait_for_status(
-        torrent_id, "finished", max_retries, retry_interval
-    )
-    return get_stream_link(pm_client, torrent_info, filename, info_hash)
+    async with Premiumize(token=user_data.streaming_provider.token) as pm_client:
+        # Check if the torrent already exists
+        torrent_info = await pm_client.get_available_torrent(info_hash, torrent_name)
+        if torrent_info:
+            torrent_id = torrent_info.get("id")
+            if torrent_info["status"] == "error":
+                await pm_client.delete_torrent(torrent_id)
+                raise ProviderException(
+                    "Not enough seeders available for parse magnet link",
+                    "transfer_error.mp4",
+                )
+        else:
+            # If torrent doesn't exist, add it
+            folder_id = await create_or_get_folder_id(pm_client, info_hash)
+            response_data = await pm_client.add_magent_link(magnet_link, folder_id)
+            if "id" not in response_data:
+                raise ProviderException(
+                    "Failed to add magnet link to Real-Debrid", "transfer_error.mp4"
+                )
+            torrent_id = response_data["id"]
+
+        # Wait for file selection and then start torrent download
+        torrent_info = await pm_client.wait_for_status(
+            torrent_id, "finished", max_retries, retry_interval
+        )
+        return await get_stream_link(pm_client, torrent_info, filename, info_hash)
 
 
-def get_stream_link(
+async def get_stream_link(
     pm_client: Premiumize, torrent_info: dict[str, Any], filename: str, info_hash: str
 ) -> str:
     """Get the stream link from the torrent info."""
     if torrent_info["folder_id"] is None:
-        torrent_folder_data = pm_client.get_folder_list(
-            create_or_get_folder_id(pm_client, info_hash)
+        torrent_folder_data = await pm_client.get_folder_list(
+            await create_or_get_folder_id(pm_client, info_hash)
         )
     else:
-        torrent_folder_data = pm_client.get_folder_list(torrent_info["folder_id"])
+        torrent_folder_data = await pm_client.get_folder_list(torrent_info["folder_id"])
     exact_match = next(
         (f for f in torrent_folder_data["content"] if f["name"] == filename), None
     )
@@ -95,14 +94,16 @@ def get_stream_link(
     return selected_file["link"]
 
 
-def update_pm_cache_status(streams: list[TorrentStreams], user_data: UserData):
+async def update_pm_cache_status(streams: list[TorrentStreams], user_data: UserData):
     """Updates the cache status of streams based on Premiumize's instant availability."""
 
     try:
-        pm_client = Premiumize(token=user_data.streaming_provider.token)
-        instant_availability_data = pm_client.get_torrent_instant_availability(
-            [stream.id for stream in streams]
-        )
+        async with Premiumize(token=user_data.streaming_provider.token) as pm_client:
+            instant_availability_data = (
+                await pm_client.get_torrent_instant_availability(
+                    [stream.id for stream in streams]
+                )
+            )
         for stream, cached_status in zip(
             streams, instant_availability_data.get("response")
         ):
@@ -112,11 +113,13 @@ def update_pm_cache_status(streams: list[TorrentStreams], user_data: UserData):
         pass
 
 
-def fetch_downloaded_info_hashes_from_premiumize(user_data: UserData) -> list[str]:
+async def fetch_downloaded_info_hashes_from_premiumize(
+    user_data: UserData,
+) -> list[str]:
     """Fetches the info_hashes of all torrents downloaded in the Premiumize account."""
     try:
-        pm_client = Premiumize(token=user_data.streaming_provider.token)
-        available_folders = pm_client.get_folder_list()
+        async with Premiumize(token=user_data.streaming_provider.token) as pm_client:
+            available_folders = await pm_client.get_folder_list()
         return [
             folder["name"]
             for folder in available_folders["content"]
@@ -127,9 +130,9 @@ def fetch_downloaded_info_hashes_from_premiumize(user_data: UserData) -> list[st
         return []
 
 
-def delete_all_torrents_from_pm(user_data: UserData):
+async def delete_all_torrents_from_pm(user_data: UserData):
     """Deletes all torrents from the Premiumize account."""
-    pm_client = Premiumize(token=user_data.streaming_provider.token)
-    folders = pm_client.get_folder_list()
-    for folder in folders["content"]:
-        pm_client.delete_folder(folder["id"])
+    async with Premiumize(token=user_data.streaming_provider.token) as pm_client:
+        folders = await pm_client.get_folder_list()
+        for folder in folders["content"]:
+            await pm_client.delete_folder(folder["id"])
@@ -10,14 +10,14 @@ router = APIRouter()
 
 @router.get("/get-device-code")
 async def get_device_code():
-    rd_client = RealDebrid()
-    return JSONResponse(
-        content=rd_client.get_device_code(), headers=const.NO_CACHE_HEADERS
-    )
+    async with RealDebrid() as rd_client:
+        return JSONResponse(
+            content=await rd_client.get_device_code(), headers=const.NO_CACHE_HEADERS
+        )
 
 
 @router.post("/authorize")
 async def authorize(data: AuthorizeData):
-    rd_client = RealDebrid()
-    response = rd_client.authorize(data.device_code)
+    async with RealDebrid() as rd_client:
+        response = await rd_client.authorize(data.device_code)
     return JSONResponse(content=response, headers=const.NO_CACHE_HEADERS)
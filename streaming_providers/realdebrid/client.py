@@ -1,11 +1,11 @@
 from base64 import b64encode, b64decode
 from typing import Any
 
-from streaming_providers.debrid_client import DebridClient
+from streaming_providers.debrid_client import AsyncDebridClient
 from streaming_providers.exceptions import ProviderException
 
 
-class RealDebrid(DebridClient):
+class RealDebrid(AsyncDebridClient):
     BASE_URL = "https://api.real-debrid.com/rest/1.0"
     OAUTH_URL = "https://api.real-debrid.com/oauth/v2"
     OPENSOURCE_CLIENT_ID = "X245A4XAIBGVM"
@@ -23,7 +23,7 @@ class RealDebrid(DebridClient):
                 "Real-Debrid Permission denied for free account", "need_premium.mp4"
             )
 
-    def _make_request(
+    async def _make_request(
         self,
         method: str,
         url: str,
@@ -35,14 +35,14 @@ class RealDebrid(DebridClient):
         if method == "POST" and self.user_ip and self.user_ip != "127.0.0.1":
             data = data or {}
             data["ip"] = self.user_ip
-        return super()._make_request(
+        return await super()._make_request(
             method, url, data, params, is_return_none, is_expected_to_fail
         )
 
-    def initialize_headers(self):
+    async def initialize_headers(self):
         if self.token:
             token_data = self.decode_token_str(self.token)
-            access_token_data = self.get_token(
+            access_token_data = await self.get_token(
                 token_data["client_id"], token_data["client_secret"], token_data["code"]
             )
             self.headers = {
@@ -62,15 +62,15 @@ class RealDebrid(DebridClient):
             raise ProviderException("Invalid token", "invalid_token.mp4")
         return {"client_id": client_id, "client_secret": client_secret, "code": code}
 
-    def get_device_code(self):
-        return self._make_request(
+    async def get_device_code(self):
+        return await self._make_request(
             "GET",
             f"{self.OAUTH_URL}/device/code",
             params={"client_id": self.OPENSOURCE_CLIENT_ID, "new_credentials": "yes"},
         )
 
-    def get_token(self, client_id, client_secret, device_code):
-        return self._make_request(
+    async def get_token(self, client_id, client_secret, device_code):
+        return await self._make_request(
             "POST",
             f"{self.OAUTH_URL}/token",
             data={
@@ -81,8 +81,8 @@ class RealDebrid(DebridClient):
             },
         )
 
-    def authorize(self, device_code):
-        response_data = self._make_request(
+    async def authorize(self, device_code):
+        response_data = await self._make_request(
             "GET",
             f"{self.OAUTH_URL}/device/credentials",
             params={"client_id": self.OPENSOURCE_CLIENT_ID, "code": device_code},
@@ -92,7 +92,7 @@ class RealDebrid(DebridClient):
         if "client_secret" not in response_data:
             return response_data
 
-        token_data = self.get_token(
+        token_data = await self.get_token(
             response_data["client_id"], response_data["client_secret"], device_code
         )
 
@@ -106,53 +106,55 @@ class RealDebrid(DebridClient):
         else:
             return token_data
 
-    def add_magent_link(self, magnet_link):
-        return self._make_request(
+    async def add_magent_link(self, magnet_link):
+        return await self._make_request(
             "POST", f"{self.BASE_URL}/torrents/addMagnet", data={"magnet": magnet_link}
         )
 
-    def get_active_torrents(self):
-        return self._make_request("GET", f"{self.BASE_URL}/torrents/activeCount")
+    async def get_active_torrents(self):
+        return await self._make_request("GET", f"{self.BASE_URL}/torrents/activeCount")
 
-    def get_user_torrent_list(self):
-        return self._make_request("GET", f"{self.BASE_URL}/torrents")
+    async def get_user_torrent_list(self):
+        return await self._make_request("GET", f"{self.BASE_URL}/torrents")
 
-    def get_user_downloads(self):
-        return self._make_request("GET", f"{self.BASE_URL}/downloads")
+    async def get_user_downloads(self):
+        return await self._make_request("GET", f"{self.BASE_URL}/downloads")
 
-    def get_torrent_info(self, torrent_id):
-        return self._make_request("GET", f"{self.BASE_URL}/torrents/info/{torrent_id}")
+    async def get_torrent_info(self, torrent_id):
+        return await self._make_request(
+            "GET", f"{self.BASE_URL}/torrents/info/{torrent_id}"
+        )
 
-    def get_torrent_instant_availability(self, torrent_hashes: list[str]):
-        return self._make_request(
+    async def get_torrent_instant_availability(self, torrent_hashes: list[str]):
+        return await self._make_request(
             "GET",
             f"{self.BASE_URL}/torrents/instantAvailability/{'/'.join(torrent_hashes)}",
         )
 
-    def disable_access_token(self):
-        return self._make_request(
+    async def disable_access_token(self):
+        return await self._make_request(
             "GET",
             f"{self.BASE_URL}/disable_access_token",
             is_return_none=True,
             is_expected_to_fail=True,
         )
 
-    def start_torrent_download(self, torrent_id, file_ids="all"):
-        return self._make_request(
+    async def start_torrent_download(self, torrent_id, file_ids="all"):
+        return await self._make_request(
             "POST",
             f"{self.BASE_URL}/torrents/selectFiles/{torrent_id}",
             data={"files": file_ids},
             is_return_none=True,
         )
 
-    def get_available_torrent(self, info_hash) -> dict[str, Any] | None:
-        available_torrents = self.get_user_torrent_list()
+    async def get_available_torrent(self, info_hash) -> dict[str, Any] | None:
+        available_torrents = await self.get_user_torrent_list()
         for torrent in available_torrents:
             if torrent["hash"] == info_hash:
                 return torrent
 
-    def create_download_link(self, link):
-        response = self._make_request(
+    async def create_download_link(self, link):
+        response = await self._make_request(
             "POST",
             f"{self.BASE_URL}/unrestrict/link",
             data={"link": link},
@@ -170,8 +172,8 @@ class RealDebrid(DebridClient):
             f"Failed to create download link. response: {response}", "api_error.mp4"
         )
 
-    def delete_torrent(self, torrent_id):
-        return self._make_request(
+    async def delete_torrent(self, torrent_id):
+        return await self._make_request(
             "DELETE",
             f"{self.BASE_URL}/torrents/delete/{torrent_id}",
             is_return_none=True,
@@ -10,6 +10,7 @@ from fastapi import (
 from fastapi.responses import RedirectResponse
 from redis.asyncio import Redis
 
+from api.middleware import get_user_data
 from db import crud
 from db.config import settings
 from streaming_providers import mapper
@@ -54,7 +55,7 @@ async def streaming_provider_endpoint(
 ):
     response.headers.update(const.NO_CACHE_HEADERS)
 
-    user_data = request.scope.get("user", crypto.decrypt_user_data(secret_str))
+    user_data = request.scope.get("user") or get_user_data(secret_str)
     if not user_data.streaming_provider:
         raise HTTPException(status_code=400, detail="No streaming provider set.")
 
@@ -99,7 +100,7 @@ async def streaming_provider_endpoint(
                 info_hash, magnet_link, user_data, stream, filename, 1, 0
             )
         elif user_data.streaming_provider.service == "realdebrid":
-            video_url = get_direct_link_from_realdebrid(
+            video_url = await get_direct_link_from_realdebrid(
                 info_hash,
                 magnet_link,
                 user_data,
@@ -111,11 +112,11 @@ async def streaming_provider_endpoint(
                 episode=episode,
             )
         elif user_data.streaming_provider.service == "alldebrid":
-            video_url = get_direct_link_from_alldebrid(
+            video_url = await get_direct_link_from_alldebrid(
                 info_hash, magnet_link, user_data, filename, 1, 0
             )
         elif user_data.streaming_provider.service == "offcloud":
-            video_url = get_direct_link_from_offcloud(
+            video_url = await get_direct_link_from_offcloud(
                 info_hash, magnet_link, user_data, filename, 1, 0
             )
         elif user_data.streaming_provider.service == "pikpak":
@@ -123,11 +124,11 @@ async def streaming_provider_endpoint(
                 info_hash, magnet_link, user_data, stream, filename, 1, 0
             )
         elif user_data.streaming_provider.service == "torbox":
-            video_url = get_direct_link_from_torbox(
+            video_url = await get_direct_link_from_torbox(
                 info_hash, magnet_link, user_data, filename, 1, 0
             )
         elif user_data.streaming_provider.service == "premiumize":
-            video_url = get_direct_link_from_premiumize(
+            video_url = await get_direct_link_from_premiumize(
                 info_hash, magnet_link, user_data, stream.torrent_name, filename, 1, 0
             )
         elif user_data.streaming_provider.service == "qbittorrent":
@@ -135,7 +136,7 @@ async def streaming_provider_endpoint(
                 info_hash, magnet_link, user_data, stream, filename, 1, 0
             )
         else:
-            video_url = get_direct_link_from_debridlink(
+            video_url = await get_direct_link_from_debridlink(
                 info_hash, magnet_link, user_data, filename, stream.file_index, 1, 0
             )
 
@@ -170,7 +171,7 @@ async def streaming_provider_endpoint(
 async def delete_all_watchlist(request: Request, response: Response, secret_str: str):
     response.headers.update(const.NO_CACHE_HEADERS)
 
-    user_data = request.scope.get("user", crypto.decrypt_user_data(secret_str))
+    user_data = request.scope.get("user") or get_user_data(secret_str)
 
     if not user_data.streaming_provider:
         raise HTTPException(status_code=400, detail="No streaming provider set.")
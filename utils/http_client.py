@@ -0,0 +1,136 @@
+import asyncio
+from importlib.util import find_spec
+
+import aiohttp
+import httpx
+
+from db.config import settings
+
+
+class HTTPClients:
+    """
+    The outbound HTTP clients of the process, one per upstream, so that the
+    requests to an upstream reuse its kept-alive connections instead of
+    opening a new connection per call. The scrapers use httpx clients and
+    the validators aiohttp sessions. They are created on first use and
+    closed on shutdown.
+    """
+
+    def __init__(self):
+        self._clients: dict[
+            str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]
+        ] = {}
+        self._sessions: dict[
+            str, tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]
+        ] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _get_stats(self, upstream: str) -> dict[str, int]:
+        return self._stats.setdefault(upstream, {"requests": 0, "connections": 0})
+
+    def get_client(
+        self,
+        upstream: str,
+        max_connections: int = settings.http_client_max_connections,
+        **kwargs,
+    ) -> httpx.AsyncClient:
+        """
+        Returns the httpx client of the upstream. The keyword arguments are
+        passed to httpx.AsyncClient when the client is created.
+        """
+        loop = asyncio.get_running_loop()
+        if upstream in self._clients:
+            client_loop, client = self._clients[upstream]
+            # The pooled connections belong to the loop which opened them.
+            if client_loop is loop and not client.is_closed:
+                return client
+
+        stats = self._get_stats(upstream)
+
+        async def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                stats["connections"] += 1
+
+        async def on_request(request: httpx.Request):
+            stats["requests"] += 1
+            request.extensions["trace"] = trace
+
+        client = httpx.AsyncClient(
+            http2=settings.http_client_http2 and find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=settings.http_client_max_keepalive_connections,
+                keepalive_expiry=settings.http_client_keepalive_expiry,
+            ),
+            event_hooks={"request": [on_request]},
+            **kwargs,
+        )
+        self._clients[upstream] = (loop, client)
+        return client
+
+    def get_session(
+        self,
+        upstream: str,
+        max_connections: int = settings.http_client_max_connections,
+        **kwargs,
+    ) -> aiohttp.ClientSession:
+        """
+        Returns the aiohttp session of the upstream. The keyword arguments are
+        passed to aiohttp.ClientSession when the session is created.
+        """
+        loop = asyncio.get_running_loop()
+        if upstream in self._sessions:
+            session_loop, session = self._sessions[upstream]
+            if session_loop is loop and not session.closed:
+                return session
+
+        stats = self._get_stats(upstream)
+
+        async def on_request_start(*_):
+            stats["requests"] += 1
+
+        async def on_connection_create_end(*_):
+            stats["connections"] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        connector = aiohttp.TCPConnector(
+            limit=max_connections,
+            ttl_dns_cache=settings.http_client_dns_cache_ttl,
+            keepalive_timeout=settings.http_client_keepalive_expiry,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector, trace_configs=[trace_config], **kwargs
+        )
+        self._sessions[upstream] = (loop, session)
+        return session
+
+    async def close(self):
+        clients = list(self._clients.values())
+        sessions = list(self._sessions.values())
+        self._clients.clear()
+        self._sessions.clear()
+        loop = asyncio.get_running_loop()
+        # The clients of a closed loop can't be closed from another one.
+        for client_loop, client in clients:
+            if client_loop is loop:
+                await client.aclose()
+        for session_loop, session in sessions:
+            if session_loop is loop:
+                await session.close()
+
+    def stats(self) -> dict:
+        stats = {}
+        for upstream, upstream_stats in self._stats.items():
+            requests = upstream_stats["requests"]
+            reused = max(requests - upstream_stats["connections"], 0)
+            stats[upstream] = {
+                **upstream_stats,
+                "reused_connections": reused,
+                "reuse_rate": round(reused / requests, 4) if requests else 0,
+            }
+        return stats
+
+
+http_clients = HTTPClients()
@@ -0,0 +1,206 @@
+import asyncio
+import gzip
+import logging
+import re
+from typing import Iterator
+
+from pymongo import ReplaceOne
+
+from db.models import IMDbTitle
+from utils.title_index import get_trigrams, normalize_title
+
+# The IMDb title types which are stored, by their catalog type.
+TITLE_TYPES = {
+    "movie": "movie",
+    "tvMovie": "movie",
+    "tvSeries": "series",
+    "tvMiniSeries": "series",
+}
+IMPORT_BATCH_SIZE = 1000
+# Fuzzy matches are the titles within a year of the searched one, sharing the
+# prefixes of its rarest words and most of its trigrams. The prefixes keep the
+# words misspelled past them.
+FUZZY_CANDIDATES_LIMIT = 1000
+FUZZY_PREFIX_LENGTH = 3
+FUZZY_MIN_SIMILARITY = 0.7
+
+
+def read_tsv(path: str) -> Iterator[list[str]]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="\n") as file:
+        next(file)  # Header
+        for line in file:
+            yield line.rstrip("\n").split("\t")
+
+
+def get_tconst_number(tconst: str) -> int:
+    return int(tconst[2:])
+
+
+def parse_titles(basics_path: str, akas_path: str | None = None) -> Iterator[dict]:
+    """
+    Yields the movies and series of title.basics with the alternative titles
+    of title.akas. Both dumps are sorted by tconst, so they are merged while
+    reading them instead of holding the alternative titles in memory.
+    """
+    akas = read_tsv(akas_path) if akas_path else iter(())
+    aka = next(akas, None)
+    for row in read_tsv(basics_path):
+        tconst, title_type, primary_title, original_title, _, start_year = row[:6]
+        tconst_number = get_tconst_number(tconst)
+        titles = {normalize_title(primary_title), normalize_title(original_title)}
+        while aka is not None and get_tconst_number(aka[0]) <= tconst_number:
+            if aka[0] == tconst:
+                titles.add(normalize_title(aka[2]))
+            aka = next(akas, None)
+
+        media_type = TITLE_TYPES.get(title_type)
+        if media_type is None:
+            continue
+        titles.discard("")
+        yield {
+            "_id": tconst,
+            "title": primary_title,
+            "year": int(start_year) if start_year != "\\N" else None,
+            "type": media_type,
+            "titles": sorted(titles),
+            "words": sorted({word for title in titles for word in title.split()}),
+        }
+
+
+async def import_titles(basics_path: str, akas_path: str | None = None):
+    """
+    Imports the IMDb dumps into the IMDbTitle collection, replacing the
+    previously imported titles.
+    """
+    collection = IMDbTitle.get_motor_collection()
+    imported_count = 0
+    operations = []
+    for title in parse_titles(basics_path, akas_path):
+        operations.append(ReplaceOne({"_id": title["_id"]}, title, upsert=True))
+        if len(operations) >= IMPORT_BATCH_SIZE:
+            await collection.bulk_write(operations, ordered=False)
+            imported_count += len(operations)
+            operations = []
+            if imported_count % 100000 == 0:
+                logging.info("Imported %d IMDb titles", imported_count)
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+        imported_count += len(operations)
+    logging.info("Imported %d IMDb titles", imported_count)
+
+
+async def find_title(title: str, year: int | None, media_type: str) -> IMDbTitle | None:
+    """
+    Returns the imported IMDb title of a title, year and catalog type. Titles
+    matching one of the known titles exactly are preferred, then the most
+    similar title released within a year, if the year is known.
+    """
+    normalized_title = normalize_title(title)
+    if not normalized_title:
+        return None
+
+    query = {"titles": normalized_title, "type": media_type}
+    if year:
+        query["year"] = year
+    matches = await IMDbTitle.find(query).limit(10).to_list()
+    if matches:
+        return next(
+            (
+                match
+                for match in matches
+                if normalize_title(match.title) == normalized_title
+            ),
+            matches[0],
+        )
+    if not year:
+        return None
+
+    candidates_query = {
+        "type": media_type,
+        "year": {"$gte": year - 1, "$lte": year + 1},
+    }
+    candidate_prefixes = await get_rarest_prefixes(
+        normalized_title.split(), candidates_query
+    )
+    if not candidate_prefixes:
+        return None
+
+    trigrams = get_trigrams(normalized_title)
+    best_match = None
+    best_similarity = FUZZY_MIN_SIMILARITY
+    async for candidate in IMDbTitle.find(
+        {
+            "$or": [get_word_prefix_query(prefix) for prefix in candidate_prefixes],
+            **candidates_query,
+        }
+    ).limit(FUZZY_CANDIDATES_LIMIT):
+        for candidate_title in candidate.titles:
+            candidate_trigrams = get_trigrams(candidate_title)
+            similarity = len(trigrams & candidate_trigrams) / len(
+                trigrams | candidate_trigrams
+            )
+            if similarity > best_similarity:
+                best_match, best_similarity = candidate, similarity
+    return best_match
+
+
+def get_word_prefix_query(prefix: str) -> dict:
+    return {"words": {"$regex": f"^{re.escape(prefix)}"}}
+
+
+async def get_rarest_prefixes(words: list[str], query: dict) -> list[str]:
+    """
+    Returns the prefixes of the rarest words of the title among the titles of
+    the query, as many as their titles fit in FUZZY_CANDIDATES_LIMIT. The
+    common words like "the" are left out, so that the limit doesn't cut off
+    the right title.
+    """
+    prefixes = list(dict.fromkeys(word[:FUZZY_PREFIX_LENGTH] for word in words))
+    counts = await asyncio.gather(
+        *(
+            IMDbTitle.find({**get_word_prefix_query(prefix), **query}).count()
+            for prefix in prefixes
+        )
+    )
+    rarest_prefixes = []
+    total_count = 0
+    for count, prefix in sorted(zip(counts, prefixes)):
+        if count == 0:
+            continue
+        if rarest_prefixes and total_count + count > FUZZY_CANDIDATES_LIMIT:
+            break
+        rarest_prefixes.append(prefix)
+        total_count += count
+    return rarest_prefixes
+
+
+def get_imdb_data(imdb_title: IMDbTitle) -> dict:
+    # The dumps have no images, the posters are served by metahub.
+    return {
+        "imdb_id": imdb_title.id,
+        "poster": f"https://live.metahub.space/poster/medium/{imdb_title.id}/img",
+        "background": f"https://live.metahub.space/background/medium/{imdb_title.id}/img",
+        "title": imdb_title.title,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from db import database
+
+    parser = argparse.ArgumentParser(
+        description="Import the IMDb datasets to resolve the titles without IMDb "
+        "lookups. The dumps are available at https://datasets.imdbws.com/."
+    )
+    parser.add_argument("basics", help="Path of title.basics.tsv(.gz)")
+    parser.add_argument("akas", nargs="?", help="Path of title.akas.tsv(.gz)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def main():
+        await database.init()
+        await import_titles(args.basics, args.akas)
+
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from imdb import Cinemagoer
+
+from db.config import settings
+from db.redis_database import get_redis
+from db.models import IMDbTitle
+from utils import imdb_dataset
+from utils.single_flight import single_flight
+
+# Cinemagoer is synchronous, its lookups run in this pool which also bounds
+# how many of them run at once.
+executor = ThreadPoolExecutor(
+    max_workers=settings.imdb_concurrency, thread_name_prefix="imdb"
+)
+_thread_local = threading.local()
+
+
+def get_cinemagoer() -> Cinemagoer:
+    # Each thread has its own client, they keep a HTTP session.
+    if not hasattr(_thread_local, "cinemagoer"):
+        _thread_local.cinemagoer = Cinemagoer()
+    return _thread_local.cinemagoer
+
+
+def search_imdb(title: str, year: int, retry: int = 5) -> dict:
+    """
+    Searches the title on IMDb, blocking. Returns an empty dict if it is not
+    found and raises if IMDb could not be reached.
+    """
+    for attempt in range(retry + 1):
+        try:
+            result = get_cinemagoer().search_movie(f"{title} {year}")
+            break
+        except Exception:
+            if attempt == retry:
+                raise
+    for movie in result:
+        if movie.get("year") == year and movie.get("title").lower() in title.lower():
+            imdb_id = f"tt{movie.movieID}"
+            poster = f"https://live.metahub.space/poster/small/{imdb_id}/img"
+            if requests.get(poster, timeout=10).status_code == 200:
+                return {
+                    "imdb_id": imdb_id,
+                    "poster": poster.replace("small", "medium"),
+                    "background": f"https://live.metahub.space/background/medium/{imdb_id}/img",
+                    "title": movie.myTitle,
+                }
+            poster = movie.get("full-size cover url")
+            return {
+                "imdb_id": imdb_id,
+                "poster": poster,
+                "background": poster,
+                "title": movie.myTitle,
+            }
+    return {}
+
+
+def get_imdb_movie(imdb_id: str) -> dict | None:
+    """
+    Returns the main details of a movie or series from IMDb, blocking.
+    """
+    movie = get_cinemagoer().get_movie(imdb_id.removeprefix("tt"), info="main")
+    if not movie.get("title"):
+        return None
+    return {
+        "title": movie.get("title"),
+        "year": movie.get("year"),
+        "poster": movie.get("full-size cover url"),
+        "description": movie.get("plot outline"),
+    }
+
+
+def get_search_cache_key(title: str, year: int | None, media_type: str) -> str:
+    return f"imdb_search:{media_type}:{title.lower()}:{year}"
+
+
+async def resolve_titles(
+    titles: list[tuple[str, int | None]], media_type: str
+) -> dict[tuple[str, int | None], dict]:
+    """
+    Returns the IMDb data of each (title, year), an empty dict for the titles
+    which are not on IMDb. The imported IMDb datasets are searched first, then
+    IMDb. The results are cached in Redis, the misses for
+    imdb_negative_cache_ttl, and concurrent lookups of a title run once.
+    """
+    titles = list(dict.fromkeys(titles))
+    if not titles:
+        return {}
+
+    redis = get_redis()
+    try:
+        cached_results = await redis.mget(
+            [get_search_cache_key(title, year, media_type) for title, year in titles]
+        )
+    except Exception as e:
+        logging.warning("Failed to get the cached IMDb searches: %s", e)
+        cached_results = [None] * len(titles)
+    results = {
+        title_year: json.loads(cached_result)
+        for title_year, cached_result in zip(titles, cached_results)
+        if cached_result is not None
+    }
+    missing_titles = [title_year for title_year in titles if title_year not in results]
+    if not missing_titles:
+        return results
+
+    loop = asyncio.get_running_loop()
+
+    async def search(title: str, year: int | None) -> dict:
+        try:
+            if imdb_title := await imdb_dataset.find_title(title, year, media_type):
+                imdb_data = imdb_dataset.get_imdb_data(imdb_title)
+            else:
+                imdb_data = await loop.run_in_executor(
+                    executor, search_imdb, title, year
+                )
+        except Exception as e:
+            # Not cached, IMDb may be reachable on the next lookup.
+            logging.warning("Failed to search %s (%s) on IMDb: %s", title, year, e)
+            return {}
+        try:
+            await redis.set(
+                get_search_cache_key(title, year, media_type),
+                json.dumps(imdb_data),
+                ex=settings.imdb_cache_ttl
+                if imdb_data
+                else settings.imdb_negative_cache_ttl,
+            )
+        except Exception as e:
+            logging.warning("Failed to cache the IMDb search of %s: %s", title, e)
+        return imdb_data
+
+    searched_results = await asyncio.gather(
+        *(
+            single_flight(
+                get_search_cache_key(title, year, media_type),
+                lambda title=title, year=year: search(title, year),
+            )
+            for title, year in missing_titles
+        )
+    )
+    results.update(zip(missing_titles, searched_results))
+    return results
+
+
+async def get_imdb_title(imdb_id: str) -> dict | None:
+    """
+    Returns the main details of an IMDb title, or None if it can't be found.
+    The imported IMDb datasets are searched first, then IMDb.
+    """
+
+    async def fetch() -> dict | None:
+        if imdb_title := await IMDbTitle.get(imdb_id):
+            return {
+                "title": imdb_title.title,
+                "year": imdb_title.year,
+                "poster": imdb_dataset.get_imdb_data(imdb_title)["poster"],
+                "description": None,
+            }
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, get_imdb_movie, imdb_id)
+        except Exception as e:
+            logging.warning("Failed to get %s from IMDb: %s", imdb_id, e)
+            return None
+
+    return await single_flight(f"imdb_title:{imdb_id}", fetch)
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from redis.asyncio import Redis
+
+from db.config import settings
+
+META_UPDATES_CHANNEL = "meta_updates"
+
+
+class LocalCache:
+    """
+    Per-process LRU cache with a TTL, bounded by the size in bytes of the cached
+    Redis payloads. Entries can be tagged with a meta id to drop them on updates.
+    """
+
+    def __init__(self, max_bytes: int, ttl: int):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[
+            str, tuple[Any, int, float, str | None]
+        ] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, _, expires_at, _ = entry
+        if expires_at < time.monotonic():
+            self.delete(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int, tag: str | None = None):
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        self._entries[key] = (value, size, time.monotonic() + self.ttl, tag)
+        self.size += size
+        if tag:
+            self._tags.setdefault(tag, set()).add(key)
+        while self.size > self.max_bytes:
+            self.delete(next(iter(self._entries)))
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        _, size, _, tag = entry
+        self.size -= size
+        if tag and (keys := self._tags.get(tag)):
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    def delete_tag(self, tag: str):
+        for key in list(self._tags.get(tag, ())):
+            self.delete(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "max_size": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+        }
+
+
+local_cache = LocalCache(settings.local_cache_max_bytes, settings.local_cache_ttl)
+
+
+async def get_cached_value(
+    redis: Redis,
+    key: str,
+    decoder: Callable[[bytes], Any] = json.loads,
+    tag: str | None = None,
+) -> Any | None:
+    """
+    Returns the decoded value of the key from the local cache,
+    falling back to Redis and keeping the decoded value locally.
+    """
+    value = local_cache.get(key)
+    if value is not None:
+        return value
+
+    data = await redis.get(key)
+    if data is None:
+        return None
+    value = decoder(data)
+    local_cache.set(key, value, len(data), tag)
+    return value
+
+
+async def set_cached_value(
+    redis: Redis,
+    key: str,
+    data: bytes | str,
+    value: Any,
+    ex: int,
+    tag: str | None = None,
+):
+    """
+    Stores the encoded data in Redis and its decoded value in the local cache.
+    """
+    await redis.set(key, data, ex=ex)
+    local_cache.set(key, value, len(data), tag)
+
+
+def get_meta_cache_keys(meta_id: str) -> list[str]:
+    return [
+        f"movie_{meta_id}_meta",
+        f"series_{meta_id}_meta",
+        f"movie_data:{meta_id}",
+    ]
+
+
+async def invalidate_meta(redis: Redis, meta_id: str):
+    """
+    Drops the cached meta data of the meta id from Redis and
+    from the local caches of all the processes.
+    """
+    await redis.delete(*get_meta_cache_keys(meta_id))
+    await redis.publish(META_UPDATES_CHANNEL, meta_id)
+
+
+async def listen_meta_updates(redis: Redis):
+    """
+    Drops the locally cached entries of the updated meta ids until cancelled.
+    """
+    while True:
+        try:
+            async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(META_UPDATES_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        local_cache.delete_tag(message["data"].decode())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error("Meta updates listener failed: %s", e)
+            await asyncio.sleep(5)
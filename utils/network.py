@@ -1,5 +1,8 @@
 import asyncio
 import logging
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from typing import Callable
 
 import httpx
@@ -113,6 +116,28 @@ async def batch_process_with_circuit_breaker(
     return results
 
 
+class HostRateLimiter:
+    """
+    Caps the concurrent requests per host and spaces their starts by interval.
+    """
+
+    def __init__(self, concurrency: int, interval: float = 0):
+        self.interval = interval
+        self._semaphores = defaultdict(lambda: asyncio.Semaphore(concurrency))
+        self._next_start: dict[str, float] = {}
+
+    @asynccontextmanager
+    async def limit(self, host: str):
+        async with self._semaphores[host]:
+            if self.interval:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.interval
+                if start > now:
+                    await asyncio.sleep(start - now)
+            yield
+
+
 async def get_redirector_url(url: str, headers: dict) -> str | None:
     """
     Get the final URL after following all redirects.
@@ -1,21 +1,33 @@
 import asyncio
 import json
+import logging
 import math
 import re
+from collections import OrderedDict
+from urllib.parse import urlparse
 
-import requests
-from imdb import Cinemagoer
 from redis.asyncio import Redis
 
 from db.config import settings
 from db.models import TorrentStreams, TVStreams
 from db.schemas import Stream, UserData
 from streaming_providers import mapper
+from streaming_providers.cache_helpers import (
+    SHARED_CACHE_STATUS_PROVIDERS,
+    get_cached_status,
+    store_cached_status,
+)
 from utils import const
-from utils.network import get_redirector_url
+from utils.network import HostRateLimiter, get_redirector_url
 from utils.validation_helper import validate_m3u8_url_with_cache
 
-ia = Cinemagoer()
+# Rendered parts of the recently served streams, see get_stream_render_parts.
+STREAM_RENDER_CACHE: OrderedDict[tuple, dict] = OrderedDict()
+STREAM_RENDER_CACHE_SIZE = 10000
+# Caps the liveness checks of the TV streams per host, across the requests.
+TV_STREAM_HOST_LIMITER = HostRateLimiter(settings.tv_stream_check_host_concurrency)
+# Keep references to the TV stream checks that outlive the request deadline.
+BACKGROUND_TV_STREAM_CHECKS: set[asyncio.Task] = set()
 ADULT_CONTENT_KEYWORDS = re.compile(
     settings.adult_content_regex_keywords,
     re.IGNORECASE,
@@ -23,7 +35,7 @@ ADULT_CONTENT_KEYWORDS = re.compile(
 
 
 async def filter_and_sort_streams(
-    streams: list[TorrentStreams], user_data: UserData
+    streams: list[TorrentStreams], user_data: UserData, redis: Redis
 ) -> list[TorrentStreams]:
     # Convert to sets for faster lookups
     selected_catalogs_set = set(user_data.selected_catalogs)
@@ -42,16 +54,7 @@ async def filter_and_sort_streams(
         return []
 
     # Step 2: Update cache status based on provider
-    cache_update_function = mapper.CACHE_UPDATE_FUNCTIONS.get(
-        user_data.streaming_provider.service
-        if user_data.streaming_provider
-        else "torrent"
-    )
-    if cache_update_function:
-        if asyncio.iscoroutinefunction(cache_update_function):
-            await cache_update_function(filtered_streams, user_data)
-        else:
-            await asyncio.to_thread(cache_update_function, filtered_streams, user_data)
+    await update_cache_status(filtered_streams, user_data, redis)
 
     # Step 3: Dynamically sort streams based on user preferences
     def dynamic_sort_key(stream):
@@ -89,15 +92,150 @@ async def filter_and_sort_streams(
     return limited_streams
 
 
+async def update_cache_status(
+    streams: list[TorrentStreams], user_data: UserData, redis: Redis
+):
+    """
+    Updates the cache status of streams based on the user's streaming provider.
+    For providers with a user independent instant availability, the status is shared
+    through Redis and only the unknown info hashes are queried from the provider.
+    """
+    service = (
+        user_data.streaming_provider.service
+        if user_data.streaming_provider
+        else "torrent"
+    )
+    cache_update_function = mapper.CACHE_UPDATE_FUNCTIONS.get(service)
+    if not cache_update_function:
+        return
+
+    is_shared_status = service in SHARED_CACHE_STATUS_PROVIDERS
+    if is_shared_status:
+        cached_statuses = await get_cached_status(
+            redis, service, [stream.id for stream in streams]
+        )
+        for stream in streams:
+            stream.cached = cached_statuses.get(stream.id)
+        streams = [stream for stream in streams if stream.cached is None]
+        if not streams:
+            return
+
+    if asyncio.iscoroutinefunction(cache_update_function):
+        await cache_update_function(streams, user_data)
+    else:
+        await asyncio.to_thread(cache_update_function, streams, user_data)
+
+    if is_shared_status:
+        # Streams left as None were not answered by the provider (e.g. API error),
+        # so they are not cached and shown as uncached for this request only.
+        await store_cached_status(
+            redis,
+            service,
+            {
+                stream.id: stream.cached
+                for stream in streams
+                if stream.cached is not None
+            },
+        )
+        for stream in streams:
+            stream.cached = bool(stream.cached)
+
+
+def get_stream_render_parts(
+    stream_data: TorrentStreams, season: int = None, episode: int = None
+) -> dict:
+    """
+    Returns the user independent parts of the rendered stream, memoized per
+    stream and episode since the same streams are rendered for every user.
+    The scrapers set updated_at when they rewrite a stream, which expires its
+    memoized parts.
+    """
+    cache_key = (
+        stream_data.id,
+        season,
+        episode,
+        stream_data.updated_at,
+        stream_data.seeders,
+    )
+    render_parts = STREAM_RENDER_CACHE.get(cache_key)
+    if render_parts is not None:
+        STREAM_RENDER_CACHE.move_to_end(cache_key)
+        return render_parts
+
+    episode_data = stream_data.get_episode(season, episode)
+
+    torrent_name = (
+        f"{stream_data.torrent_name}/{episode_data.title}"
+        if episode_data
+        else stream_data.torrent_name
+    )
+    torrent_name = "📂 " + torrent_name.replace(".torrent", "").replace(".", " ")
+
+    quality_detail_parts = [
+        ("📺 " + stream_data.quality) if stream_data.quality else None,
+        ("🎞️ " + stream_data.codec) if stream_data.codec else None,
+        ("🎵 " + stream_data.audio) if stream_data.audio else None,
+    ]
+    quality_detail = " ".join(filter(None, quality_detail_parts))
+
+    resolution = stream_data.resolution.upper() if stream_data.resolution else "N/A"
+
+    seeders_info = (
+        f"👤 {stream_data.seeders}" if stream_data.seeders is not None else None
+    )
+    if episode_data and episode_data.size:
+        size_info = f"{convert_bytes_to_readable(episode_data.size)} / {convert_bytes_to_readable(stream_data.size)}"
+    else:
+        size_info = convert_bytes_to_readable(stream_data.size)
+
+    languages = (
+        "🌐 " + " + ".join(stream_data.languages) if stream_data.languages else None
+    )
+    source_info = f"🔗 {stream_data.source}"
+    secondary_info = " ".join(filter(None, [size_info, seeders_info]))
+
+    sources = [f"tracker:{tracker}" for tracker in stream_data.announce_list]
+    sources.append(f"dht:{stream_data.id}")
+
+    render_parts = {
+        "resolution": resolution,
+        # The description starts with either the torrent name or the quality detail.
+        "description": {
+            show_full_torrent_name: "\n".join(
+                filter(None, [primary_info, secondary_info, languages, source_info])
+            )
+            for show_full_torrent_name, primary_info in (
+                (True, torrent_name),
+                (False, quality_detail),
+            )
+        },
+        "file_index": episode_data.file_index
+        if episode_data
+        else stream_data.file_index,
+        "episode_query": f"&season={season}&episode={episode}" if episode_data else "",
+        "binge_group": f"MediaFusion-{quality_detail}-{resolution}",
+        "sources": sources,
+    }
+
+    STREAM_RENDER_CACHE[cache_key] = render_parts
+    if len(STREAM_RENDER_CACHE) > STREAM_RENDER_CACHE_SIZE:
+        STREAM_RENDER_CACHE.popitem(last=False)
+    return render_parts
+
+
 async def parse_stream_data(
     streams: list[TorrentStreams],
     user_data: UserData,
     secret_str: str,
+    redis: Redis,
     season: int = None,
     episode: int = None,
-) -> list[Stream]:
+) -> list[dict]:
+    """
+    Renders the streams as plain dicts in the Stream schema, without the None values.
+    """
     stream_list = []
-    streams = await filter_and_sort_streams(streams, user_data)
+    streams = await filter_and_sort_streams(streams, user_data, redis)
 
     # Compute values that do not change per iteration outside the loop
     show_full_torrent_name = user_data.show_full_torrent_name
@@ -114,79 +252,30 @@ async def parse_stream_data(
     )
 
     for stream_data in streams:
-        episode_data = stream_data.get_episode(season, episode)
-
-        if show_full_torrent_name:
-            torrent_name = (
-                f"{stream_data.torrent_name}/{episode_data.title}"
-                if episode_data
-                else stream_data.torrent_name
-            )
-            torrent_name = "📂 " + torrent_name.replace(".torrent", "").replace(".", " ")
-        else:
-            torrent_name = None
-
-        quality_detail_parts = [
-            ("📺 " + stream_data.quality) if stream_data.quality else None,
-            ("🎞️ " + stream_data.codec) if stream_data.codec else None,
-            ("🎵 " + stream_data.audio) if stream_data.audio else None,
-        ]
-        quality_detail = " ".join(filter(None, quality_detail_parts))
-
-        resolution = stream_data.resolution.upper() if stream_data.resolution else "N/A"
+        render_parts = get_stream_render_parts(stream_data, season, episode)
         streaming_provider_status = "⚡️" if stream_data.cached else "⏳"
 
-        seeders_info = (
-            f"👤 {stream_data.seeders}" if stream_data.seeders is not None else None
-        )
-        if episode_data and episode_data.size:
-            size_info = f"{convert_bytes_to_readable(episode_data.size)} / {convert_bytes_to_readable(stream_data.size)}"
-        else:
-            size_info = convert_bytes_to_readable(stream_data.size)
-
-        languages = (
-            "🌐 " + " + ".join(stream_data.languages) if stream_data.languages else None
-        )
-        source_info = f"🔗 {stream_data.source}"
-
-        primary_info = torrent_name if show_full_torrent_name else quality_detail
-        secondary_info = " ".join(filter(None, [size_info, seeders_info]))
-
-        description_parts = [
-            primary_info,
-            secondary_info,
-            languages,
-            source_info,
-        ]
-        description = "\n".join(filter(None, description_parts))
-
         stream_details = {
-            "name": f"MediaFusion {streaming_provider_name} {resolution} {streaming_provider_status}",
-            "description": description,
-            "infoHash": stream_data.id,
-            "fileIdx": episode_data.file_index
-            if episode_data
-            else stream_data.file_index,
-            "behaviorHints": {
-                "bingeGroup": f"MediaFusion-{quality_detail}-{resolution}",
-            },
+            "name": f"MediaFusion {streaming_provider_name} {render_parts['resolution']} {streaming_provider_status}",
+            "description": render_parts["description"][show_full_torrent_name],
         }
 
         if has_streaming_provider:
-            base_proxy_url = base_proxy_url_template.format(stream_data.id) + (
-                f"&season={season}&episode={episode}" if episode_data else ""
-            )
-            stream_details.update(
-                {"url": base_proxy_url, "behaviorHints": {"notWebReady": True}}
+            stream_details["url"] = (
+                base_proxy_url_template.format(stream_data.id)
+                + render_parts["episode_query"]
             )
-            stream_details.pop("infoHash", None)
-            stream_details.pop("fileIdx", None)
+            stream_details["behaviorHints"] = {"notWebReady": True}
         else:
-            sources = [f"tracker:{tracker}" for tracker in stream_data.announce_list]
-            sources.append(f"dht:{stream_data.id}")
-            stream_details["sources"] = sources
+            stream_details["infoHash"] = stream_data.id
+            if render_parts["file_index"] is not None:
+                stream_details["fileIdx"] = render_parts["file_index"]
+            stream_details["behaviorHints"] = {
+                "bingeGroup": render_parts["binge_group"]
+            }
+            stream_details["sources"] = render_parts["sources"]
 
-        stream_list.append(Stream(**stream_details))
+        stream_list.append(stream_details)
 
     return stream_list
 
@@ -225,64 +314,94 @@ def get_catalogs(catalog: str, languages: list[str]) -> list[str]:
     return [f"{lang.lower()}_{base_catalog}" for lang in languages]
 
 
-def search_imdb(title: str, year: int, retry: int = 5) -> dict:
-    try:
-        result = ia.search_movie(f"{title} {year}")
-    except Exception:
-        return search_imdb(title, year, retry - 1) if retry > 0 else {}
-    for movie in result:
-        if movie.get("year") == year and movie.get("title").lower() in title.lower():
-            imdb_id = f"tt{movie.movieID}"
-            poster = f"https://live.metahub.space/poster/small/{imdb_id}/img"
-            if requests.get(poster).status_code == 200:
-                return {
-                    "imdb_id": imdb_id,
-                    "poster": poster.replace("small", "medium"),
-                    "background": f"https://live.metahub.space/background/medium/{imdb_id}/img",
-                    "title": movie.myTitle,
-                }
-            poster = movie.get("full-size cover url")
-            return {
-                "imdb_id": imdb_id,
-                "poster": poster,
-                "background": poster,
-                "title": movie.myTitle,
-            }
-    return {}
+async def get_redirector_url_with_cache(
+    redis: Redis, url: str, headers: dict
+) -> str | None:
+    cache_key = f"redirector_url:{url}"
+    cache_data = await redis.get(cache_key)
+    if cache_data is not None:
+        return cache_data.decode() or None
+
+    async with TV_STREAM_HOST_LIMITER.limit(urlparse(url).netloc):
+        stream_link = await get_redirector_url(url, headers)
+    await redis.set(cache_key, stream_link or "", ex=180)
+    return stream_link
+
+
+async def check_tv_stream(stream: TVStreams, redis: Redis) -> str | None:
+    """
+    Returns the URL to play a TV stream from, or None if it is not working.
+    """
+    behavior_hints = stream.behaviorHints or {}
+    if behavior_hints.get("is_redirect", False):
+        return await get_redirector_url_with_cache(
+            redis,
+            stream.url,
+            behavior_hints.get("proxyHeaders", {}).get("request", {}),
+        )
+    is_working, _ = await validate_m3u8_url_with_cache(
+        redis, stream.url, behavior_hints, TV_STREAM_HOST_LIMITER
+    )
+    return stream.url if is_working else None
 
 
 async def parse_tv_stream_data(
     tv_streams: list[TVStreams], redis: Redis
 ) -> list[Stream]:
+    """
+    Checks the TV streams concurrently within tv_stream_check_deadline.
+    The working streams are listed first, then the streams whose check is
+    still running, which keep running in the background to fill the cache.
+    Both are ordered by their last known health.
+    """
+    tv_streams = sorted(
+        tv_streams, key=lambda stream: stream.health_score, reverse=True
+    )
+    # Keyed by position, the streams of the events have no id.
+    check_tasks = {}
+    for index, stream in enumerate(tv_streams):
+        if stream.url and (
+            settings.validate_m3u8_urls_liveness
+            or (stream.behaviorHints or {}).get("is_redirect", False)
+        ):
+            check_tasks[index] = asyncio.create_task(check_tv_stream(stream, redis))
+
+    if check_tasks:
+        await asyncio.wait(
+            check_tasks.values(), timeout=settings.tv_stream_check_deadline
+        )
+
     stream_list = []
-    for stream in tv_streams:
-        if stream.behaviorHints and stream.behaviorHints.get("is_redirect", False):
-            stream_link = await get_redirector_url(
-                stream.url,
-                stream.behaviorHints.get("proxyHeaders", {}).get("request", {}),
-            )
-            if stream_link is None:
+    unchecked_stream_list = []
+    for index, stream in enumerate(tv_streams):
+        stream_url = stream.url
+        task = check_tasks.get(index)
+        if task and task.done():
+            if task.exception():
+                logging.error(
+                    "Error checking TV stream %s: %s", stream.url, task.exception()
+                )
                 continue
-            stream.url = stream_link
-        elif settings.validate_m3u8_urls_liveness:
-            is_working, _ = await validate_m3u8_url_with_cache(
-                redis, stream.url, stream.behaviorHints or {}
-            )
-            if not is_working:
+            stream_url = task.result()
+            if stream_url is None:
                 continue
 
         country_info = f"\n🌐 {stream.country}" if stream.country else ""
-
-        stream_list.append(
-            Stream(
-                name="MediaFusion",
-                description=f"📺 {stream.name}{country_info}\n🔗 {stream.source}",
-                url=stream.url,
-                ytId=stream.ytId,
-                behaviorHints=stream.behaviorHints,
-            )
+        parsed_stream = Stream(
+            name="MediaFusion",
+            description=f"📺 {stream.name}{country_info}\n🔗 {stream.source}",
+            url=stream_url,
+            ytId=stream.ytId,
+            behaviorHints=stream.behaviorHints,
         )
+        if task and not task.done():
+            unchecked_stream_list.append(parsed_stream)
+            BACKGROUND_TV_STREAM_CHECKS.add(task)
+            task.add_done_callback(BACKGROUND_TV_STREAM_CHECKS.discard)
+        else:
+            stream_list.append(parsed_stream)
 
+    stream_list.extend(unchecked_stream_list)
     if not stream_list:
         stream_list.append(
             Stream(
@@ -388,3 +507,74 @@ def is_contain_18_plus_keywords(title: str) -> bool:
 def get_json_data(file_name: str) -> dict:
     with open(file_name) as file:
         return json.load(file)
+
+
+if __name__ == "__main__":
+    # Renders a 500 stream season pack, with and without the memoized parts.
+    import timeit
+    from datetime import datetime
+
+    import orjson
+
+    from db.schemas import Streams
+    from utils.stream_codec import CachedTorrentStream
+
+    streams = [
+        CachedTorrentStream(
+            [
+                f"{index:040x}",
+                f"Some.Series.S01.Complete.1080p.WEB-DL.x264-Group{index}",
+                40 * 1024**3 + index,
+                None,
+                None,
+                [
+                    f"udp://tracker{tracker}.example.com:1337/announce"
+                    for tracker in range(15)
+                ],
+                ["English", "Tamil"],
+                "TamilMV",
+                ["english_series"],
+                "1080p",
+                "x264",
+                "WEB-DL",
+                "AAC",
+                None,
+                index,
+                datetime.now().isoformat(),
+                datetime.now().isoformat(),
+                [
+                    1,
+                    [
+                        [episode, f"S01E{episode:02}.mkv", 2 * 1024**3, episode, None]
+                        for episode in range(1, 21)
+                    ],
+                ],
+            ]
+        )
+        for index in range(500)
+    ]
+    user_data = UserData(
+        selected_catalogs=["english_series"],
+        max_streams_per_resolution=500,
+        show_full_torrent_name=True,
+    )
+
+    def render():
+        return asyncio.run(parse_stream_data(streams, user_data, "secret", None, 1, 5))
+
+    def render_cold():
+        STREAM_RENDER_CACHE.clear()
+        return render()
+
+    rendered_streams = render()
+    print(f"rendered streams: {len(rendered_streams)}")
+    for name, func in {
+        "cold render": render_cold,
+        "memoized render": render,
+        "orjson dump": lambda: orjson.dumps({"streams": rendered_streams}),
+        "pydantic dump": lambda: Streams(streams=rendered_streams).model_dump_json(
+            exclude_none=True
+        ),
+    }.items():
+        seconds = timeit.timeit(func, number=50) / 50
+        print(f"{name:>16}: {seconds * 1000:7.2f} ms")
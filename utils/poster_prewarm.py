@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from urllib.parse import urlparse
+
+import dramatiq
+import httpx
+from redis.asyncio import Redis
+
+from db.config import settings
+from db.models import (
+    MediaFusionEventsMetaData,
+    MediaFusionMovieMetaData,
+    MediaFusionSeriesMetaData,
+    MediaFusionTVMetaData,
+)
+from db.schemas import MetaPosterProjection
+from utils import local_cache
+from utils.network import HostRateLimiter
+from utils.parser import get_json_data
+
+CATALOG_PAGE_SIZE = 25
+
+
+async def warm_posters(posters: list[list[str]], refresh: bool = False):
+    """
+    Requests the posters from the API so that they are rendered and stored
+    before the clients ask for them. Each poster is given as
+    [catalog_type, meta_id, source_url], the rate limits apply to the hosts
+    of the source images, which are fetched by the API on a cache miss.
+    """
+    base_url = settings.poster_prewarm_url or settings.host_url
+    accept_headers = ["image/jpeg"]
+    if settings.enable_webp_posters:
+        accept_headers.append("image/webp")
+
+    semaphore = asyncio.Semaphore(settings.poster_prewarm_concurrency)
+    host_limiter = HostRateLimiter(
+        settings.poster_prewarm_host_concurrency,
+        settings.poster_prewarm_host_interval,
+    )
+    redis = Redis.from_url(settings.redis_url)
+
+    async def warm_poster(
+        client: httpx.AsyncClient, catalog_type: str, meta_id: str, source_url: str
+    ):
+        async with host_limiter.limit(urlparse(source_url).netloc), semaphore:
+            if refresh:
+                await redis.delete(
+                    f"poster:{catalog_type}_{meta_id}.jpg",
+                    f"poster:{catalog_type}_{meta_id}.webp",
+                )
+                await local_cache.invalidate_meta(redis, meta_id)
+            for accept in accept_headers:
+                try:
+                    response = await client.get(
+                        f"{base_url}/poster/{catalog_type}/{meta_id}.jpg",
+                        headers={"Accept": accept},
+                    )
+                except httpx.HTTPError as e:
+                    logging.warning("Failed to prewarm poster of %s: %s", meta_id, e)
+                    return
+                if response.status_code != 200:
+                    logging.debug(
+                        "Poster of %s not available: %s", meta_id, response.status_code
+                    )
+                    return
+
+    try:
+        async with httpx.AsyncClient(timeout=45) as client:
+            await asyncio.gather(
+                *(
+                    warm_poster(client, catalog_type, meta_id, source_url)
+                    for catalog_type, meta_id, source_url in posters
+                    if source_url
+                )
+            )
+    finally:
+        await redis.aclose()
+    logging.info("Prewarmed %d posters", len(posters))
+
+
+async def get_catalog_posters(pages: int) -> list[list[str]]:
+    """
+    Returns the posters of the first pages of every catalog.
+    """
+    limit = pages * CATALOG_PAGE_SIZE
+    manifest = get_json_data("resources/manifest.json")
+    posters = {}
+
+    for catalog in manifest["catalogs"]:
+        if catalog["type"] not in ("movie", "series") or catalog["id"].startswith(
+            "mediafusion_search"
+        ):
+            continue
+        meta_class = (
+            MediaFusionMovieMetaData
+            if catalog["type"] == "movie"
+            else MediaFusionSeriesMetaData
+        )
+        metas = (
+            await meta_class.find(
+                meta_class.catalogs == catalog["id"],
+                meta_class.is_poster_working != False,
+            )
+            .sort(-meta_class.latest_stream_created_at)
+            .limit(limit)
+            .project(MetaPosterProjection)
+            .to_list()
+        )
+        for meta in metas:
+            posters[meta.id] = [catalog["type"], meta.id, meta.poster]
+
+    tv_metas = (
+        await MediaFusionTVMetaData.find(
+            MediaFusionTVMetaData.streams.is_working == True,
+            MediaFusionTVMetaData.is_poster_working != False,
+            fetch_links=True,
+        )
+        .sort(-MediaFusionTVMetaData.streams.created_at)
+        .limit(limit)
+        .project(MetaPosterProjection)
+        .to_list()
+    )
+    for meta in tv_metas:
+        posters[meta.id] = ["tv", meta.id, meta.poster]
+
+    redis = Redis.from_url(settings.redis_url)
+    try:
+        for event_key in await redis.zrevrange("events:all", 0, limit - 1):
+            if event_json := await redis.get(event_key):
+                event = MediaFusionEventsMetaData.model_validate_json(event_json)
+                posters[event.id] = ["events", event.id, event.poster]
+    finally:
+        await redis.aclose()
+
+    return list(posters.values())
+
+
+@dramatiq.actor(priority=10, time_limit=30 * 60 * 1000)
+async def prewarm_posters(posters: list[list[str]], refresh: bool = False):
+    """Render the posters of new or updated metas."""
+    await warm_posters(posters, refresh)
+
+
+@dramatiq.actor(priority=10, time_limit=60 * 60 * 1000)
+async def prewarm_catalog_posters(pages: int = None):
+    """Render the posters of the first pages of every catalog."""
+    posters = await get_catalog_posters(pages or settings.poster_prewarm_pages)
+    await warm_posters(posters)
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+
+from redis.asyncio import Redis
+
+from db.config import settings
+from utils import local_cache
+
+
+class PosterStore:
+    """
+    Content-addressed image files on the local disk, named by the sha256 of
+    their content so that identical images are stored once. Redis only maps
+    the poster keys to the digests. The files are evicted by last access time
+    once the store grows beyond max_bytes.
+    """
+
+    def __init__(self, root: str, max_bytes: int, prune_interval: int = 60):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._prune_task: asyncio.Task | None = None
+
+    def get_path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    async def get(self, redis: Redis, key: str, tag: str | None = None) -> str | None:
+        """
+        Returns the digest of the stored image of the key, if its file is
+        still in the store.
+        """
+        digest = await local_cache.get_cached_value(
+            redis, f"poster:{key}", bytes.decode, tag
+        )
+        if digest is None:
+            return None
+        try:
+            # Record the access for the LRU eviction
+            await asyncio.to_thread(os.utime, self.get_path(digest))
+        except FileNotFoundError:
+            return None
+        return digest
+
+    async def put(
+        self, redis: Redis, key: str, data: bytes, ex: int, tag: str | None = None
+    ) -> str:
+        """
+        Stores the image of the key and returns its digest.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        await asyncio.to_thread(self.write_file, digest, data)
+        await local_cache.set_cached_value(
+            redis, f"poster:{key}", digest, digest, ex, tag
+        )
+        self.schedule_prune()
+        return digest
+
+    def read(self, digest: str) -> bytes:
+        with open(self.get_path(digest), "rb") as file:
+            return file.read()
+
+    def write_file(self, digest: str, data: bytes):
+        path = self.get_path(digest)
+        if os.path.exists(path):
+            os.utime(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+
+    def schedule_prune(self):
+        now = time.monotonic()
+        if now - self._last_prune < self.prune_interval:
+            return
+        if self._prune_task and not self._prune_task.done():
+            return
+        self._last_prune = now
+        self._prune_task = asyncio.create_task(asyncio.to_thread(self.prune))
+
+    def prune(self):
+        """
+        Removes the least recently used files until the store fits max_bytes.
+        Other workers may prune at the same time, removals are idempotent.
+        """
+        files = []
+        total_size = 0
+        for directory, _, file_names in os.walk(self.root):
+            for file_name in file_names:
+                if file_name.endswith(".tmp"):
+                    continue  # Being written
+                path = os.path.join(directory, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_bytes:
+            return
+
+        files.sort()
+        removed = 0
+        for _, size, path in files:
+            if total_size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            removed += 1
+        logging.info("Removed %d files from the poster store", removed)
+
+
+poster_store = PosterStore(settings.poster_store_path, settings.poster_store_max_bytes)
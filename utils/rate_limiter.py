@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+
+from redis.asyncio import Redis
+
+# GCRA (generic cell rate algorithm) limiter, in a single round trip.
+# The key stores the theoretical arrival time (TAT) of the next request in ms.
+# A request may take up to ARGV[3] tokens at once, the script grants as many
+# as the window allows and returns {granted, ms until the next token}.
+GCRA_SCRIPT = """
+local emission_interval = tonumber(ARGV[1])
+local burst_tolerance = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+
+local redis_time = redis.call("TIME")
+local now = tonumber(redis_time[1]) * 1000 + math.floor(tonumber(redis_time[2]) / 1000)
+
+local tat = tonumber(redis.call("GET", KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local available = math.floor((now + burst_tolerance - tat) / emission_interval)
+local granted = math.min(requested, available)
+if granted <= 0 then
+    return {0, math.ceil(tat + emission_interval - burst_tolerance - now)}
+end
+
+tat = tat + granted * emission_interval
+redis.call("SET", KEYS[1], string.format("%.3f", tat), "PX", math.ceil(tat - now))
+return {granted, 0}
+"""
+
+
+class RateLimiter:
+    """
+    Limits each key to `limit` requests per `window` seconds with GCRA,
+    which spreads the window evenly instead of resetting a counter.
+
+    With a lease_size above 1, a worker takes up to lease_size tokens of a key
+    at once and spends them locally, so only one request in lease_size goes to
+    Redis. Leased tokens are dropped once their window is over.
+    """
+
+    def __init__(self, redis: Redis, lease_size: int = 0, max_leases: int = 10000):
+        self.redis = redis
+        self.lease_size = lease_size
+        self.max_leases = max_leases
+        self.script = redis.register_script(GCRA_SCRIPT)
+        # key -> (tokens, expires_at) of the unspent tokens leased by this
+        # worker, or (0, retry_at) while the key is limited.
+        self._leases: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    async def acquire(self, key: str, limit: int, window: int) -> bool:
+        if self.lease_size <= 1:
+            granted, _ = await self.take_tokens(key, limit, window, 1)
+            return granted > 0
+
+        now = time.monotonic()
+        tokens, expires_at = self._leases.get(key, (0, 0.0))
+        if expires_at > now:
+            if tokens == 0:
+                return False  # Limited until the next token is available
+            if tokens == 1:
+                del self._leases[key]
+            else:
+                self._leases[key] = (tokens - 1, expires_at)
+            return True
+
+        granted, retry_after = await self.take_tokens(
+            key, limit, window, min(self.lease_size, limit)
+        )
+        if granted > 1:
+            self.set_lease(key, granted - 1, now + window)
+        if granted > 0:
+            return True
+        self.set_lease(key, 0, now + retry_after / 1000)
+        return False
+
+    async def take_tokens(
+        self, key: str, limit: int, window: int, requested: int
+    ) -> tuple[int, int]:
+        window_ms = window * 1000
+        granted, retry_after = await self.script(
+            keys=[key], args=[window_ms / limit, window_ms, requested]
+        )
+        return int(granted), int(retry_after)
+
+    def set_lease(self, key: str, tokens: int, expires_at: float):
+        self._leases[key] = (tokens, expires_at)
+        self._leases.move_to_end(key)
+        if len(self._leases) > self.max_leases:
+            self._leases.popitem(last=False)
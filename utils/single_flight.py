@@ -0,0 +1,61 @@
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+from redis.asyncio import Redis
+from redis.exceptions import LockError
+
+T = TypeVar("T")
+
+# The running computation of each key in this process.
+_in_flight: dict[str, asyncio.Task] = {}
+
+
+async def single_flight(key: str, func: Callable[[], Awaitable[T]]) -> T:
+    """
+    Runs func once per key within the process, concurrent callers with the same
+    key await the result of the running call instead of starting their own.
+    Callers get the same result object, so it should not be mutated.
+    """
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(func())
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # Shield the shared task so a cancelled caller does not cancel the others.
+    return await asyncio.shield(task)
+
+
+async def redis_single_flight(
+    redis: Redis,
+    key: str,
+    compute: Callable[[], Awaitable[T]],
+    load: Callable[[], Awaitable[T | None]],
+    timeout: int = 30,
+) -> T:
+    """
+    Runs compute once per key across the workers sharing the Redis.
+    The worker holding the lock computes and stores the result, the others wait
+    for the lock to be released and load the stored result instead.
+    If there is no stored result (e.g. the holder failed), the caller computes it.
+    """
+    lock = redis.lock(f"single_flight:{key}", timeout=timeout, blocking_timeout=timeout)
+    if await lock.acquire(blocking=False):
+        try:
+            return await compute()
+        finally:
+            await release_lock_silently(lock)
+
+    if await lock.acquire():
+        await release_lock_silently(lock)
+    result = await load()
+    if result is None:
+        result = await compute()
+    return result
+
+
+async def release_lock_silently(lock):
+    try:
+        await lock.release()
+    except LockError:
+        # The lock expired while computing, another worker may hold it now.
+        pass
@@ -0,0 +1,217 @@
+from datetime import datetime
+from importlib.util import find_spec
+
+import orjson
+
+from db.models import TorrentStreams, Season, Episode
+
+if find_spec("zstandard") is not None:
+    import zstandard
+else:
+    zstandard = None
+
+# The first byte of an encoded payload tells how the rest has to be decoded.
+# Payloads without a known marker are from the previous pydantic JSON format.
+RAW_FORMAT = b"\x03"
+ZSTD_FORMAT = b"\x04"
+
+# Only the fields required to build the stream responses are cached.
+# Streams are stored as positional arrays in this order to keep the payload small,
+# so bump the format markers when changing it.
+STREAM_FIELDS = (
+    "id",
+    "torrent_name",
+    "size",
+    "filename",
+    "file_index",
+    "announce_list",
+    "languages",
+    "source",
+    "catalog",
+    "resolution",
+    "codec",
+    "quality",
+    "audio",
+    "encoder",
+    "seeders",
+)
+EPISODE_FIELDS = ("episode_number", "filename", "size", "file_index", "title")
+
+
+def encode_streams(streams: list[TorrentStreams], compress: bool = False) -> bytes:
+    """
+    Encodes the streams for the cache, compressed with zstd if requested and available.
+    """
+    payload = orjson.dumps(
+        [
+            [getattr(stream, field) for field in STREAM_FIELDS]
+            + [
+                stream.created_at.isoformat(),
+                stream.updated_at.isoformat() if stream.updated_at else None,
+                encode_season(stream.season) if stream.season else None,
+            ]
+            for stream in streams
+        ]
+    )
+    if compress and zstandard is not None:
+        return ZSTD_FORMAT + zstandard.ZstdCompressor().compress(payload)
+    return RAW_FORMAT + payload
+
+
+def encode_season(season: Season) -> list:
+    return [
+        season.season_number,
+        [
+            [getattr(episode, field) for field in EPISODE_FIELDS]
+            for episode in season.episodes
+        ],
+    ]
+
+
+class CachedEpisode:
+    __slots__ = EPISODE_FIELDS
+
+    def __init__(self, values: list):
+        (
+            self.episode_number,
+            self.filename,
+            self.size,
+            self.file_index,
+            self.title,
+        ) = values
+
+
+class CachedSeason:
+    __slots__ = ("season_number", "episodes")
+
+    def __init__(self, values: list):
+        season_number, episodes = values
+        self.season_number = season_number
+        self.episodes = [CachedEpisode(episode) for episode in episodes]
+
+
+class CachedTorrentStream:
+    """
+    Lightweight read-only stand-in of TorrentStreams built from the cache,
+    providing the attributes used to build the stream responses.
+    """
+
+    __slots__ = STREAM_FIELDS + ("created_at", "updated_at", "season", "cached")
+
+    def __init__(self, values: list):
+        (
+            self.id,
+            self.torrent_name,
+            self.size,
+            self.filename,
+            self.file_index,
+            self.announce_list,
+            self.languages,
+            self.source,
+            self.catalog,
+            self.resolution,
+            self.codec,
+            self.quality,
+            self.audio,
+            self.encoder,
+            self.seeders,
+            created_at,
+            updated_at,
+            season,
+        ) = values
+        self.created_at = datetime.fromisoformat(created_at)
+        self.updated_at = datetime.fromisoformat(updated_at) if updated_at else None
+        self.season = CachedSeason(season) if season else None
+        self.cached = False
+
+    get_episode = TorrentStreams.get_episode
+
+
+def decode_streams(data: bytes) -> list[CachedTorrentStream] | None:
+    """
+    Builds the streams from an encoded payload without running the pydantic validation.
+    Returns None if the payload is not in a known format.
+    """
+    marker, payload = data[:1], data[1:]
+    if marker == ZSTD_FORMAT:
+        if zstandard is None:
+            return None
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif marker != RAW_FORMAT:
+        return None
+
+    return [CachedTorrentStream(values) for values in orjson.loads(payload)]
+
+
+if __name__ == "__main__":
+    # Compares the cache payload size and the decode time against the pydantic JSON format.
+    import asyncio
+    import timeit
+
+    from db import database
+    from db.schemas import TorrentStreamsList
+
+    # The documents can only be validated once beanie is initialized.
+    asyncio.run(database.init())
+
+    streams = [
+        TorrentStreams.model_construct(
+            id=f"{index:040x}",
+            torrent_name=f"Some.Series.S01.Complete.1080p.WEB-DL.x264-Group{index}",
+            size=40 * 1024**3,
+            filename=None,
+            file_index=None,
+            announce_list=[
+                f"udp://tracker{tracker}.example.com:1337/announce"
+                for tracker in range(15)
+            ],
+            languages=["English", "Tamil"],
+            source="TamilMV",
+            catalog=["english_series", "tamil_series"],
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            resolution="1080p",
+            codec="x264",
+            quality="WEB-DL",
+            audio="AAC",
+            encoder=None,
+            seeders=index,
+            meta_id="tt0000001",
+            season=Season.model_construct(
+                season_number=1,
+                episodes=[
+                    Episode.model_construct(
+                        episode_number=episode,
+                        filename=f"Some.Series.S01E{episode:02}.1080p.WEB-DL.mkv",
+                        size=2 * 1024**3,
+                        file_index=episode,
+                        title=None,
+                        released=datetime.now(),
+                    )
+                    for episode in range(1, 21)
+                ],
+            ),
+        )
+        for index in range(100)
+    ]
+
+    json_payload = TorrentStreamsList.model_construct(streams=streams).model_dump_json(
+        exclude_none=True
+    )
+    raw_payload = encode_streams(streams)
+    formats = {
+        "pydantic json": (
+            json_payload,
+            lambda: TorrentStreamsList.model_validate_json(json_payload),
+        ),
+        "orjson": (raw_payload, lambda: decode_streams(raw_payload)),
+    }
+    if zstandard is not None:
+        zstd_payload = encode_streams(streams, compress=True)
+        formats["orjson + zstd"] = (zstd_payload, lambda: decode_streams(zstd_payload))
+
+    for name, (payload, decode) in formats.items():
+        seconds = timeit.timeit(decode, number=100) / 100
+        print(
+            f"{name:>14}: {len(payload) / 1024:8.1f} KiB, {seconds * 1000:7.2f} ms per decode"
+        )
@@ -0,0 +1,304 @@
+import asyncio
+import heapq
+import logging
+import math
+import os
+import re
+import unicodedata
+from array import array
+from collections import Counter
+
+import orjson
+from redis.asyncio import Redis
+
+from db.config import settings
+from db.redis_database import get_redis
+from db.models import (
+    MediaFusionMetaData,
+    MediaFusionMovieMetaData,
+    MediaFusionSeriesMetaData,
+    MediaFusionTVMetaData,
+)
+
+TITLE_INDEX_UPDATES_CHANNEL = "title_index_updates"
+
+# The meta fields the search results are built from.
+SEARCH_META_PROJECTION = {
+    field: 1
+    for field in [
+        "title",
+        "poster",
+        "background",
+        "description",
+        "runtime",
+        "website",
+        "country",
+        "tv_language",
+        "logo",
+        "genres",
+    ]
+}
+
+META_CLASSES = {
+    "movie": MediaFusionMovieMetaData,
+    "series": MediaFusionSeriesMetaData,
+    "tv": MediaFusionTVMetaData,
+}
+
+
+def build_search_meta(catalog_type: str, item: dict) -> dict:
+    """
+    Builds the search result of a meta from its projected fields, for the
+    title index and the database search alike. The results are catalog
+    previews, the episodes of the series are served by their meta.
+    """
+    meta_id = item["_id"]
+    if catalog_type == "movie":
+        return {
+            "_id": meta_id,
+            "type": "movie",
+            "title": item["title"],
+            "poster": f"{settings.host_url}/poster/movie/{meta_id}.jpg",
+            "background": item.get("poster"),
+            "description": item.get("description"),
+            "runtime": item.get("runtime"),
+            "website": item.get("website"),
+        }
+    if catalog_type == "tv":
+        return {
+            **item,
+            "type": "tv",
+            "description": item.get("description") or item["title"],
+        }
+    return {
+        "_id": meta_id,
+        "type": "series",
+        "title": item["title"],
+        "poster": f"{settings.host_url}/poster/series/{meta_id}.jpg",
+        "background": item.get("background") or item.get("poster"),
+    }
+
+
+def normalize_title(title: str) -> str:
+    title = unicodedata.normalize("NFKD", title)
+    title = "".join(char for char in title if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^\w]+", " ", title.lower()).split())
+
+
+def get_trigrams(normalized_title: str) -> set[str]:
+    # Words are padded so that their start and end are trigrams of their own.
+    trigrams = set()
+    for word in normalized_title.split():
+        padded = f" {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+class TitleIndex:
+    """
+    Trigram index of the titles of one catalog type. Matching on trigrams
+    tolerates typos and partial words, titles matching or starting with the
+    query are boosted.
+    Replaced titles keep their stale slot until the index is rebuilt.
+    """
+
+    def __init__(self):
+        self.metas: list[dict | None] = []
+        self.titles: list[str] = []
+        self.trigram_counts = array("H")
+        self.slots: dict[str, int] = {}
+        self.postings: dict[str, array] = {}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, meta: dict):
+        title = normalize_title(meta["title"])
+        slot = self.slots.get(meta["_id"])
+        if slot is not None:
+            if self.titles[slot] == title:
+                self.metas[slot] = meta
+                return
+            self.metas[slot] = None
+
+        slot = len(self.metas)
+        trigrams = get_trigrams(title)
+        self.metas.append(meta)
+        self.titles.append(title)
+        self.trigram_counts.append(min(len(trigrams), 0xFFFF))
+        self.slots[meta["_id"]] = slot
+        for trigram in trigrams:
+            posting = self.postings.get(trigram)
+            if posting is None:
+                posting = self.postings[trigram] = array("I")
+            posting.append(slot)
+
+    def search(
+        self, query: str, limit: int = 100, min_coverage: float = 0.5
+    ) -> list[dict]:
+        query = normalize_title(query)
+        query_trigrams = get_trigrams(query)
+        if not query_trigrams:
+            return []
+
+        hits = Counter()
+        for trigram in query_trigrams:
+            if posting := self.postings.get(trigram):
+                hits.update(posting)
+
+        # Titles must contain min_coverage of the query trigrams, they are
+        # ranked by that coverage and then by their similarity to the query.
+        query_count = len(query_trigrams)
+        min_count = math.ceil(query_count * min_coverage)
+        scores = []
+        for slot, count in hits.items():
+            if count < min_count or self.metas[slot] is None:
+                continue
+            score = count / query_count + count / (
+                query_count + self.trigram_counts[slot] - count
+            )
+            title = self.titles[slot]
+            if title == query:
+                score += 1
+            elif title.startswith(query):
+                score += 0.5
+            scores.append((score, slot))
+
+        return [self.metas[slot] for _, slot in heapq.nlargest(limit, scores)]
+
+
+class TitleSearch:
+    """
+    Title indexes of the movie, series and tv metas of the process.
+    They are loaded from the disk snapshot at startup, rebuilt from the
+    database in the background and kept updated through Redis.
+    """
+
+    def __init__(self, snapshot_path: str):
+        self.snapshot_path = snapshot_path
+        self.indexes: dict[str, TitleIndex] | None = None
+        # Updates received while rebuilding, applied to the rebuilt indexes.
+        self._pending_updates: list[tuple[str, dict]] | None = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.indexes is not None
+
+    def search(self, query: str, catalog_type: str) -> dict:
+        return {"metas": self.indexes[catalog_type].search(query)}
+
+    def add(self, catalog_type: str, meta: dict):
+        if self._pending_updates is not None:
+            self._pending_updates.append((catalog_type, meta))
+        if self.indexes is not None:
+            self.indexes[catalog_type].add(meta)
+
+    def load_snapshot(self) -> bool:
+        try:
+            with open(self.snapshot_path, "rb") as file:
+                snapshot = orjson.loads(file.read())
+        except FileNotFoundError:
+            return False
+        except (OSError, orjson.JSONDecodeError) as e:
+            logging.warning("Failed to load the title index snapshot: %s", e)
+            return False
+
+        indexes = {catalog_type: TitleIndex() for catalog_type in META_CLASSES}
+        for catalog_type, metas in snapshot.items():
+            for meta in metas:
+                indexes[catalog_type].add(meta)
+        self.indexes = indexes
+        return True
+
+    def save_snapshot(self):
+        snapshot = {
+            catalog_type: [meta for meta in index.metas if meta is not None]
+            for catalog_type, index in self.indexes.items()
+        }
+        temp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(orjson.dumps(snapshot))
+        os.replace(temp_path, self.snapshot_path)
+
+    async def rebuild(self):
+        if self._pending_updates is None:
+            self._pending_updates = []
+        try:
+            indexes = {}
+            for catalog_type, meta_class in META_CLASSES.items():
+                index = indexes[catalog_type] = TitleIndex()
+                async for item in meta_class.find().aggregate(
+                    [{"$project": SEARCH_META_PROJECTION}]
+                ):
+                    index.add(build_search_meta(catalog_type, item))
+            for catalog_type, meta in self._pending_updates:
+                indexes[catalog_type].add(meta)
+            self.indexes = indexes
+        finally:
+            self._pending_updates = None
+
+    async def run(self, redis: Redis):
+        """
+        Serves the snapshot, if any, while rebuilding the indexes from the
+        database, then applies the published updates until cancelled.
+        """
+        self._pending_updates = []
+        listener = asyncio.create_task(self.listen_updates(redis))
+        try:
+            if await asyncio.to_thread(self.load_snapshot):
+                logging.info("Loaded the title index snapshot")
+            await self.rebuild()
+            logging.info(
+                "Built the title index: %s",
+                {
+                    catalog_type: len(index)
+                    for catalog_type, index in self.indexes.items()
+                },
+            )
+            await asyncio.to_thread(self.save_snapshot)
+            await listener
+        except asyncio.CancelledError:
+            listener.cancel()
+            raise
+        except Exception as e:
+            logging.error("Failed to build the title index: %s", e)
+            await listener
+
+    async def listen_updates(self, redis: Redis):
+        while True:
+            try:
+                async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(TITLE_INDEX_UPDATES_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            update = orjson.loads(message["data"])
+                            self.add(update["catalog_type"], update["meta"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error("Title index updates listener failed: %s", e)
+                await asyncio.sleep(5)
+
+
+title_search = TitleSearch(settings.title_index_snapshot_path)
+
+
+async def publish_titles(metas: list[MediaFusionMetaData]):
+    """
+    Adds the titles of stored metas to the title indexes of all the processes,
+    in one round trip on the shared Redis client.
+    """
+    pipeline = get_redis().pipeline(transaction=False)
+    for meta in metas:
+        item = meta.model_dump(include=set(SEARCH_META_PROJECTION))
+        item["_id"] = meta.id
+        update = {"catalog_type": meta.type, "meta": build_search_meta(meta.type, item)}
+        pipeline.publish(TITLE_INDEX_UPDATES_CHANNEL, orjson.dumps(update))
+    try:
+        await pipeline.execute()
+    except Exception as e:
+        logging.error("Failed to publish the titles of %d metas: %s", len(metas), e)
+
+
+async def publish_title(meta: MediaFusionMetaData):
+    await publish_titles([meta])
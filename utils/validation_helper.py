@@ -1,15 +1,25 @@
 import asyncio
 import json
 import logging
+import math
+from datetime import date, datetime, timedelta
 from urllib.parse import urlparse
 
 import aiohttp
 import dramatiq
 from aiohttp import ClientError
+from pymongo import UpdateOne
 from redis.asyncio import Redis
 
 from db import schemas
+from db.config import settings
 from utils import const
+from utils.http_client import http_clients
+from utils.lock import acquire_redis_lock, release_redis_lock
+from utils.network import HostRateLimiter
+
+# Weight of the latest check in the health score of a TV stream.
+HEALTH_SCORE_WEIGHT = 0.3
 
 
 def is_valid_url(url: str) -> bool:
@@ -17,17 +27,24 @@ def is_valid_url(url: str) -> bool:
     return all([parsed_url.scheme, parsed_url.netloc])
 
 
+def get_tv_streams_session() -> aiohttp.ClientSession:
+    # Shared by the TV stream checks of the requests and of the scheduler.
+    return http_clients.get_session(
+        "tv_streams", max_connections=settings.tv_stream_check_concurrency
+    )
+
+
 async def does_url_exist(url: str) -> bool:
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.head(
-                url, allow_redirects=True, timeout=10, headers=const.UA_HEADER
-            ) as response:
-                logging.info("URL: %s, Status: %s", url, response.status)
-                return response.status == 200
-        except (ClientError, asyncio.TimeoutError) as err:
-            logging.error("URL: %s, Status: %s", url, err)
-            return False
+    session = http_clients.get_session("url_validation", headers=const.UA_HEADER)
+    try:
+        async with session.head(
+            url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
+            logging.info("URL: %s, Status: %s", url, response.status)
+            return response.status == 200
+    except (ClientError, asyncio.TimeoutError) as err:
+        logging.error("URL: %s, Status: %s", url, err)
+        return False
 
 
 async def validate_image_url(url: str) -> bool:
@@ -35,38 +52,52 @@ async def validate_image_url(url: str) -> bool:
 
 
 async def validate_m3u8_url(
-    url: str, behaviour_hint: dict, validate_url: bool = False
+    url: str,
+    behaviour_hint: dict,
+    validate_url: bool = False,
+    session: aiohttp.ClientSession | None = None,
 ) -> (bool, bool):
     if validate_url and not is_valid_url(url):
         return False, False
 
+    if session is None:
+        session = get_tv_streams_session()
+
     headers = behaviour_hint.get("proxyHeaders", {}).get("request", {})
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.head(
-                url,
-                allow_redirects=True,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=30),
-            ) as response:
-                content_type = response.headers.get("Content-Type", "").lower()
-
-                is_valid = content_type in const.M3U8_VALID_CONTENT_TYPES
-                # Check if a redirect occurred. Compare the final URL with the initial one.
-                is_redirect = str(response.url) != url
-                return is_valid, is_redirect
-        except (ClientError, asyncio.TimeoutError) as err:
-            logging.error(err)
-            return False, False
-
-
-async def validate_m3u8_url_with_cache(redis: Redis, url: str, behaviour_hint: dict):
+    try:
+        async with session.head(
+            url,
+            allow_redirects=True,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=30),
+        ) as response:
+            content_type = response.headers.get("Content-Type", "").lower()
+
+            is_valid = content_type in const.M3U8_VALID_CONTENT_TYPES
+            # Check if a redirect occurred. Compare the final URL with the initial one.
+            is_redirect = str(response.url) != url
+            return is_valid, is_redirect
+    except (ClientError, asyncio.TimeoutError) as err:
+        logging.error(err)
+        return False, False
+
+
+async def validate_m3u8_url_with_cache(
+    redis: Redis,
+    url: str,
+    behaviour_hint: dict,
+    host_limiter: HostRateLimiter | None = None,
+):
     cache_key = f"m3u8_url:{url}"
     cache_data = await redis.get(cache_key)
     if cache_data:
         return json.loads(cache_data)
 
-    is_valid, is_redirect = await validate_m3u8_url(url, behaviour_hint)
+    if host_limiter:
+        async with host_limiter.limit(urlparse(url).netloc):
+            is_valid, is_redirect = await validate_m3u8_url(url, behaviour_hint)
+    else:
+        is_valid, is_redirect = await validate_m3u8_url(url, behaviour_hint)
     await redis.set(cache_key, json.dumps((is_valid, is_redirect)), ex=180)
     return is_valid, is_redirect
 
@@ -77,14 +108,14 @@ class ValidationError(Exception):
 
 async def validate_yt_id(yt_id: str) -> bool:
     image_url = f"https://img.youtube.com/vi/{yt_id}/mqdefault.jpg"
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.head(
-                image_url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                return response.status == 200
-        except (ClientError, asyncio.TimeoutError):
-            return False
+    session = http_clients.get_session("url_validation", headers=const.UA_HEADER)
+    try:
+        async with session.head(
+            image_url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=5)
+        ) as response:
+            return response.status == 200
+    except (ClientError, asyncio.TimeoutError):
+        return False
 
 
 async def validate_tv_metadata(metadata: schemas.TVMetaData) -> list[schemas.TVStreams]:
@@ -168,20 +199,159 @@ def is_video_file(filename: str) -> bool:
     )
 
 
+def get_tv_channel_requests_key(day: date) -> str:
+    return f"tv_channel_requests:{day.isoformat()}"
+
+
+async def record_tv_channel_request(redis: Redis, meta_id: str):
+    """
+    Counts the stream requests of a TV channel, the popular channels are
+    checked more often.
+    """
+    key = get_tv_channel_requests_key(date.today())
+    await redis.pipeline(transaction=False).zincrby(key, 1, meta_id).expire(
+        key, 2 * 24 * 60 * 60
+    ).execute()
+
+
+async def get_tv_channel_requests(redis: Redis) -> dict[str, float]:
+    """
+    Returns the stream requests of the TV channels of today and yesterday.
+    """
+    today = date.today()
+    pipeline = redis.pipeline(transaction=False)
+    for day in [today, today - timedelta(days=1)]:
+        pipeline.zrange(get_tv_channel_requests_key(day), 0, -1, withscores=True)
+
+    requests = {}
+    for day_requests in await pipeline.execute():
+        for meta_id, count in day_requests:
+            meta_id = meta_id.decode()
+            requests[meta_id] = requests.get(meta_id, 0) + count
+    return requests
+
+
+def get_tv_stream_health_update(
+    stream, is_working: bool, requests: float, now: datetime
+) -> UpdateOne:
+    """
+    Scores the check of a stream and schedules its next one. Working streams
+    are checked every tv_stream_check_interval, divided by the popularity of
+    their channel. Failing streams are retried with an exponential backoff,
+    so that the dead ones are rarely checked.
+    """
+    health_score = (
+        1 - HEALTH_SCORE_WEIGHT
+    ) * stream.health_score + HEALTH_SCORE_WEIGHT * is_working
+    if is_working:
+        failure_count = 0
+        interval = max(
+            settings.tv_stream_check_interval / (1 + math.log2(1 + requests)),
+            settings.tv_stream_retry_interval,
+        )
+    else:
+        failure_count = stream.failure_count + 1
+        interval = min(
+            settings.tv_stream_retry_interval * 2 ** (failure_count - 1),
+            settings.tv_stream_max_check_interval,
+        )
+
+    return UpdateOne(
+        {"_id": stream.id},
+        {
+            "$set": {
+                "is_working": is_working,
+                "health_score": health_score,
+                "failure_count": failure_count,
+                "last_checked_at": now,
+                "next_check_at": now + timedelta(seconds=interval),
+            }
+        },
+    )
+
+
 @dramatiq.actor(time_limit=30 * 60 * 1000, priority=5)  # time limit is 30 minutes
 async def validate_tv_streams_in_db():
-    """Validate TV streams in the database."""
+    """
+    Checks the TV streams which are due, up to tv_stream_check_batch_size of
+    them per run. The streams are read with a cursor and checked over a
+    shared connection pool, tv_stream_check_host_concurrency at once per host,
+    and the results are written in bulk.
+    """
     from db.models import TVStreams
 
-    async def validate_and_update_tv_stream(stream):
-        is_valid, _ = await validate_m3u8_url(stream.url, stream.behaviorHints or {})
-        stream.is_working = is_valid
-        await stream.save()
-        logging.info(f"Stream: {stream.name}, Status: {is_valid}")
-
-    tv_streams = await TVStreams.all().to_list()
-    tasks = [
-        asyncio.create_task(validate_and_update_tv_stream(stream))
-        for stream in tv_streams
-    ]
-    await asyncio.gather(*tasks)
+    redis = Redis.from_url(settings.redis_url)
+    acquired, lock = await acquire_redis_lock(
+        redis, "validate_tv_streams_in_db", timeout=30 * 60
+    )
+    if not acquired:
+        await redis.aclose()
+        return
+
+    try:
+        requests = await get_tv_channel_requests(redis)
+        collection = TVStreams.get_motor_collection()
+        host_limiter = HostRateLimiter(settings.tv_stream_check_host_concurrency)
+        # Bounds the streams waiting for their host, the connector bounds
+        # the checks in flight.
+        pending = asyncio.Semaphore(settings.tv_stream_check_concurrency * 10)
+        updates = []
+        tasks = set()
+        checked_count = working_count = 0
+
+        async def check_stream(stream: TVStreams):
+            nonlocal checked_count, working_count
+            try:
+                async with host_limiter.limit(urlparse(stream.url).netloc):
+                    is_working, _ = await validate_m3u8_url(
+                        stream.url, stream.behaviorHints or {}
+                    )
+                updates.append(
+                    get_tv_stream_health_update(
+                        stream,
+                        is_working,
+                        requests.get(stream.meta_id, 0),
+                        datetime.now(),
+                    )
+                )
+                checked_count += 1
+                working_count += is_working
+            finally:
+                pending.release()
+
+        async def flush_updates():
+            if updates:
+                batch = updates.copy()
+                updates.clear()
+                await collection.bulk_write(batch, ordered=False)
+
+        # Streams which were never checked sort first.
+        async for stream in (
+            TVStreams.find(
+                {
+                    "url": {"$ne": None},
+                    "$or": [
+                        {"next_check_at": None},
+                        {"next_check_at": {"$lte": datetime.now()}},
+                    ],
+                }
+            )
+            .sort(+TVStreams.next_check_at)
+            .limit(settings.tv_stream_check_batch_size)
+        ):
+            await pending.acquire()
+            task = asyncio.create_task(check_stream(stream))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            if len(updates) >= 500:
+                await flush_updates()
+
+        await asyncio.gather(*tasks)
+        await flush_updates()
+
+        logging.info(
+            "Checked %d TV streams, %d are working", checked_count, working_count
+        )
+    finally:
+        await release_redis_lock(lock)
+        await redis.aclose()